@@ -0,0 +1,204 @@
+"""
+Время построения отчётов report_generator.py на синтетических данных за
+несколько лет: по каждому разрезу и план/факт за месяц, год и весь период.
+
+Данные генерируются во временных таблицах, которые перекрывают рабочие
+на время сессии, поэтому реальные данные не затрагиваются.
+
+    python -m benchmarks.reports --years 3 --workers 50 --entries-per-day 6
+
+Результат с параметрами по умолчанию (219 000 записей с 01.01.2024,
+PostgreSQL 16.2, настройки по умолчанию, 1 CPU), медиана из 5 запусков:
+
+    отчёт                                  месяц, мс           год, мс   весь период, мс
+    по разрезу «проект»                          2.9              28.0              53.5
+    по разрезу «этап»                            3.7              60.2             161.5
+    по разрезу «отдел»                           3.1              49.1             172.1
+    по разрезу «шрифт»                           3.8              57.5             154.5
+    по разрезу «сотрудник»                       3.6              29.0              56.6
+    проекты по месяцам                           5.1              84.6             215.4
+    проекты по неделям                           4.7              50.4             131.3
+    план / факт по месяцам                       5.3              55.7             195.5
+
+Недельные суммы time_entry_weekly на тех же данных, медиана из 31 запуска
+вперемежку с отчётами только по time_entry, мс (месяц / год / весь период):
+
+    по разрезу «проект»        2.9 → 3.3    41.7 → 27.3    100.6 → 45.8
+    по разрезу «сотрудник»     2.2 → 3.1    34.8 → 29.1     91.3 → 57.3
+    проекты по неделям         5.4 → 4.9    94.2 → 61.8    190.8 → 116.4
+    по разрезу «этап»          2.0 → 2.0    33.8 → 33.9    141.7 → 147.4
+
+Этапы, отделы, шрифты и разбивка по месяцам читают time_entry в обоих
+вариантах, поэтому этап приведён для сравнения с шумом измерений.
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+import psycopg2
+
+from data.database import Database, connection_params
+from report_generator import GroupBy, Period, ReportFilter, ReportGenerator
+
+STAGES = ["подготовка", "отрисовка прямые", "отрисовка италики", "отрисовка капитель", "техничка", "оформление"]
+DEPARTMENTS = ["шрифтовой", "технический", "графический", "контентный"]
+
+
+def create_synthetic_years(cursor, years: int, workers: int, projects: int, tasks_per_project: int,
+                           entries_per_day: int) -> date:
+    start = date(date.today().year - years + 1, 1, 1)
+    cursor.execute("""
+        CREATE TEMP TABLE position (id SERIAL PRIMARY KEY, name TEXT, department TEXT);
+        CREATE TEMP TABLE worker (id SERIAL PRIMARY KEY, name TEXT, position_id INTEGER, weekly_hours INTEGER);
+        CREATE TEMP TABLE project (id SERIAL PRIMARY KEY, name TEXT);
+        CREATE TEMP TABLE task (id SERIAL PRIMARY KEY, name TEXT, stage TEXT, department TEXT);
+        CREATE TEMP TABLE font (id SERIAL PRIMARY KEY, name TEXT);
+        CREATE TEMP TABLE project_task (
+            id SERIAL PRIMARY KEY, project_id INTEGER, task_id INTEGER, font_id INTEGER
+        );
+        CREATE TEMP TABLE time_entry (
+            id SERIAL PRIMARY KEY,
+            project_task_id INTEGER NOT NULL,
+            worker_id INTEGER NOT NULL,
+            entry_date DATE NOT NULL,
+            hours DOUBLE PRECISION NOT NULL,
+            comment TEXT,
+            UNIQUE (worker_id, project_task_id, entry_date)
+        );
+        CREATE TEMP TABLE time_entry_weekly (
+            worker_id INTEGER NOT NULL,
+            project_id INTEGER NOT NULL,
+            week_start DATE NOT NULL,
+            hours DOUBLE PRECISION NOT NULL,
+            entries INTEGER NOT NULL,
+            PRIMARY KEY (worker_id, project_id, week_start)
+        );
+        CREATE INDEX ON time_entry (worker_id, entry_date);
+        CREATE INDEX ON time_entry (entry_date);
+        CREATE INDEX ON time_entry_weekly (week_start);
+        CREATE INDEX ON project_task (project_id);
+    """)
+
+    cursor.execute("""
+        INSERT INTO position (name, department)
+        SELECT 'должность ' || d, d FROM unnest(%(departments)s::text[]) d;
+
+        INSERT INTO worker (name, position_id, weekly_hours)
+        SELECT 'сотрудник ' || w, 1 + w %% 4, (ARRAY[20, 30, 40])[1 + w %% 3]
+        FROM generate_series(1, %(workers)s) w;
+
+        INSERT INTO project (name) SELECT 'проект ' || p FROM generate_series(1, %(projects)s) p;
+        INSERT INTO font (name) SELECT 'шрифт ' || p FROM generate_series(1, %(projects)s) p;
+
+        INSERT INTO task (name, stage, department)
+        SELECT 'задача ' || t, (%(stages)s::text[])[1 + t %% 6], (%(departments)s::text[])[1 + t %% 4]
+        FROM generate_series(1, %(tasks)s) t;
+
+        INSERT INTO project_task (project_id, task_id, font_id)
+        SELECT p, t, p FROM generate_series(1, %(projects)s) p, generate_series(1, %(tasks)s) t;
+    """, dict(departments=DEPARTMENTS, stages=STAGES, workers=workers, projects=projects, tasks=tasks_per_project))
+
+    # Для каждого работника и рабочего дня — entries_per_day разных задач
+    cursor.execute("""
+        INSERT INTO time_entry (project_task_id, worker_id, entry_date, hours)
+        SELECT DISTINCT ON (w, d, pt)
+               pt, w, d, 1 + (random() * 3)::int
+        FROM generate_series(1, %(workers)s) w,
+             generate_series(%(start)s::date, %(end)s::date, '1 day') d,
+             LATERAL (
+                 SELECT 1 + ((w * 31 + extract(doy FROM d)::int * 7 + n * 13) %% %(project_tasks)s) AS pt
+                 FROM generate_series(1, %(per_day)s) n
+             ) tasks
+        WHERE extract(isodow FROM d) < 6
+    """, dict(workers=workers, start=start, end=date.today(), project_tasks=projects * tasks_per_project,
+              per_day=entries_per_day))
+
+    # Недельные суммы, которые в рабочей БД поддерживает триггер из миграции 2
+    cursor.execute("""
+        INSERT INTO time_entry_weekly (worker_id, project_id, week_start, hours, entries)
+        SELECT te.worker_id, pt.project_id, date_trunc('week', te.entry_date)::date, SUM(te.hours), COUNT(*)
+        FROM time_entry te
+        JOIN project_task pt ON pt.id = te.project_task_id
+        GROUP BY 1, 2, 3
+    """)
+
+    cursor.execute("ANALYZE position; ANALYZE worker; ANALYZE project; ANALYZE task; ANALYZE font; "
+                   "ANALYZE project_task; ANALYZE time_entry; ANALYZE time_entry_weekly;")
+    return start
+
+
+def measure(func, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--tasks-per-project", type=int, default=25)
+    parser.add_argument("--entries-per-day", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    db = Database(psycopg2.connect(**connection_params()))
+    try:
+        with db.conn.cursor() as cursor:
+            start = create_synthetic_years(cursor, args.years, args.workers, args.projects,
+                                           args.tasks_per_project, args.entries_per_day)
+            cursor.execute("SELECT COUNT(*) FROM time_entry")
+            print(f"Сгенерировано записей времени: {cursor.fetchone()[0]} с {start:%d.%m.%Y}\n")
+
+        # Отчёты откатывают транзакцию, а временные таблицы должны её пережить
+        db.conn.commit()
+
+        today = date.today()
+        ranges = {
+            "месяц": today.replace(day=1),
+            "год": today - timedelta(days=365),
+            "весь период": start,
+        }
+        reports = {f"по разрезу «{dimension.value}»": (dimension,) for dimension in GroupBy}
+
+        print(f"{'отчёт':<30}" + "".join(f"{name + ', мс':>18}" for name in ranges))
+        for name, group_by in reports.items():
+            timings = [
+                measure(lambda: ReportGenerator.hours(db, group_by, ReportFilter(start_date=range_start)),
+                        args.repeats)
+                for range_start in ranges.values()
+            ]
+            print(f"{name:<30}" + "".join(f"{timing:>18.1f}" for timing in timings))
+
+        timings = [
+            measure(lambda: ReportGenerator.hours(db, (GroupBy.PROJECT,), ReportFilter(start_date=range_start),
+                                                  period=Period.MONTH), args.repeats)
+            for range_start in ranges.values()
+        ]
+        print(f"{'проекты по месяцам':<30}" + "".join(f"{timing:>18.1f}" for timing in timings))
+
+        timings = [
+            measure(lambda: ReportGenerator.hours(db, (GroupBy.PROJECT,), ReportFilter(start_date=range_start),
+                                                  period=Period.WEEK), args.repeats)
+            for range_start in ranges.values()
+        ]
+        print(f"{'проекты по неделям':<30}" + "".join(f"{timing:>18.1f}" for timing in timings))
+
+        timings = [
+            measure(lambda: ReportGenerator.plan_vs_actual(db, range_start, today, period=Period.MONTH),
+                    args.repeats)
+            for range_start in ranges.values()
+        ]
+        print(f"{'план / факт по месяцам':<30}" + "".join(f"{timing:>18.1f}" for timing in timings))
+    finally:
+        db.conn.rollback()
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main()
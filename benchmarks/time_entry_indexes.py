@@ -0,0 +1,172 @@
+"""
+Сравнение времени горячих запросов к time_entry/project_task до и после
+индексов из миграции 1 (data/migrations.py).
+
+Данные генерируются во временных таблицах, которые перекрывают рабочие
+на время сессии, поэтому реальные данные не затрагиваются.
+
+    python -m benchmarks.time_entry_indexes --workers 50 --entries-per-day 6
+
+Результат с параметрами по умолчанию (78 300 записей, PostgreSQL 16.2,
+настройки по умолчанию, 1 CPU), медиана EXPLAIN ANALYZE из 20 запусков:
+
+    запрос                            без индексов, мс     с индексами, мс   ускорение
+    записи работника за месяц                    6.988               0.074       93.8x
+    недельная сводка работника                   6.906               0.036      194.5x
+    задачи проекта                               0.080               0.017        4.7x
+    обновление при импорте                       6.259               0.006     1043.2x
+"""
+import argparse
+import statistics
+from datetime import date
+
+import psycopg2
+
+from data.database import connection_params
+
+YEAR_START = date(2024, 1, 1)
+
+QUERIES = {
+    "записи работника за месяц": (
+        """
+        SELECT te.id, te.entry_date, te.hours
+        FROM time_entry te
+        WHERE te.worker_id = %(worker_id)s
+          AND te.entry_date BETWEEN %(month_start)s AND %(month_end)s
+        ORDER BY te.entry_date DESC, te.id DESC
+        """
+    ),
+    "недельная сводка работника": (
+        """
+        SELECT te.project_task_id, SUM(te.hours)
+        FROM time_entry te
+        WHERE te.worker_id = %(worker_id)s
+          AND te.entry_date BETWEEN %(week_start)s AND %(week_end)s
+        GROUP BY te.project_task_id
+        """
+    ),
+    "задачи проекта": (
+        """
+        SELECT pt.id, pt.task_id, pt.font_id
+        FROM project_task pt
+        WHERE pt.project_id = %(project_id)s
+        """
+    ),
+    "обновление при импорте": (
+        """
+        SELECT te.id
+        FROM time_entry te
+        WHERE te.worker_id = %(worker_id)s
+          AND te.project_task_id = %(project_task_id)s
+          AND te.entry_date = %(week_start)s
+        """
+    ),
+}
+
+PARAMS = {
+    "worker_id": 7,
+    "project_id": 13,
+    "project_task_id": 130,
+    "month_start": date(2024, 6, 1),
+    "month_end": date(2024, 6, 30),
+    "week_start": date(2024, 6, 3),
+    "week_end": date(2024, 6, 9),
+}
+
+INDEXES = """
+    ALTER TABLE time_entry
+        ADD CONSTRAINT time_entry_worker_task_date_key
+        UNIQUE (worker_id, project_task_id, entry_date);
+    CREATE INDEX time_entry_worker_date_idx ON time_entry (worker_id, entry_date);
+    CREATE INDEX project_task_project_idx ON project_task (project_id);
+"""
+
+
+def create_synthetic_year(cursor, workers: int, projects: int, tasks_per_project: int, entries_per_day: int):
+    cursor.execute("""
+        CREATE TEMP TABLE project_task (
+            id SERIAL PRIMARY KEY,
+            project_id INTEGER,
+            task_id INTEGER,
+            font_id INTEGER,
+            status VARCHAR(20) NOT NULL DEFAULT 'в процессе',
+            comments TEXT
+        );
+        CREATE TEMP TABLE time_entry (
+            id SERIAL PRIMARY KEY,
+            project_task_id INTEGER NOT NULL,
+            worker_id INTEGER NOT NULL,
+            entry_date DATE NOT NULL,
+            hours DOUBLE PRECISION NOT NULL,
+            comment TEXT
+        );
+    """)
+
+    cursor.execute("""
+        INSERT INTO project_task (project_id, task_id, font_id)
+        SELECT p, t, p
+        FROM generate_series(1, %s) p, generate_series(1, %s) t
+    """, (projects, tasks_per_project))
+
+    # Для каждого работника и рабочего дня — entries_per_day разных задач
+    cursor.execute("""
+        INSERT INTO time_entry (project_task_id, worker_id, entry_date, hours)
+        SELECT DISTINCT ON (w, d, pt)
+               pt, w, d, 1 + (random() * 3)::int
+        FROM generate_series(1, %(workers)s) w,
+             generate_series(%(start)s::date, %(start)s::date + 364, '1 day') d,
+             LATERAL (
+                 SELECT 1 + ((w * 31 + extract(doy FROM d)::int * 7 + n * 13) %% %(tasks)s) AS pt
+                 FROM generate_series(1, %(per_day)s) n
+             ) tasks
+        WHERE extract(isodow FROM d) < 6
+    """, dict(workers=workers, start=YEAR_START, tasks=projects * tasks_per_project, per_day=entries_per_day))
+
+    cursor.execute("ANALYZE project_task; ANALYZE time_entry;")
+    cursor.execute("SELECT COUNT(*) FROM time_entry")
+    return cursor.fetchone()[0]
+
+
+def measure(cursor, repeats: int) -> dict:
+    results = {}
+    for name, query in QUERIES.items():
+        timings = []
+        for _ in range(repeats):
+            cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, PARAMS)
+            timings.append(cursor.fetchone()[0][0]["Execution Time"])
+        results[name] = statistics.median(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--tasks-per-project", type=int, default=25)
+    parser.add_argument("--entries-per-day", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**connection_params())
+    try:
+        with conn.cursor() as cursor:
+            rows = create_synthetic_year(cursor, args.workers, args.projects,
+                                         args.tasks_per_project, args.entries_per_day)
+            print(f"Сгенерировано записей времени: {rows}\n")
+
+            before = measure(cursor, args.repeats)
+            cursor.execute(INDEXES)
+            cursor.execute("ANALYZE project_task; ANALYZE time_entry;")
+            after = measure(cursor, args.repeats)
+
+        print(f"{'запрос':<30}{'без индексов, мс':>20}{'с индексами, мс':>20}{'ускорение':>12}")
+        for name in QUERIES:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"{name:<30}{before[name]:>20.3f}{after[name]:>20.3f}{speedup:>11.1f}x")
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,21 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram_dialog import setup_dialogs
 
-from data.database import db
+from cpu_executor import cpu_executor
+from data.database import Database, DatabasePool
+from data.executor import db_executor
+from data.migrations import check_schema
+from data.partitioning import PartitionMaintainer, partitioning_mode
+from loop_monitor import EventLoopMonitor
 from middlewares.database_middleware import DatabaseMiddleware
+from middlewares.identity_middleware import IdentityMiddleware
+from middlewares.job_runner_middleware import JobRunnerMiddleware
 from middlewares.message_sender_middleware import MessageSenderMiddleware
 from middlewares.notification_sender_middleware import NotificationSenderMiddleware
 from routers.admin import admin_router
 from routers.worker import worker_router
 from routers.default import default_router
+from routers.jobs import jobs_router
 
 
 def setup_logging():
@@ -36,17 +44,45 @@ bot = Bot(
 dp = Dispatcher()
 
 
+def check_schema_version():
+    db = Database()
+    try:
+        check_schema(db)
+    finally:
+        db.conn.close()
+
+
 async def main():
     setup_logging()
+    check_schema_version()
+    cpu_executor.start()
+    pool = DatabasePool()
 
-    database_middleware = DatabaseMiddleware(db)
+    loop_monitor = EventLoopMonitor()
+    loop_monitor.start()
+
+    partition_maintainer = None
+    if partitioning_mode():
+        partition_maintainer = PartitionMaintainer(pool, partitioning_mode())
+        partition_maintainer.start()
+
+    database_middleware = DatabaseMiddleware(pool)
+    identity_middleware = IdentityMiddleware(database_middleware.pool)
     message_sender_middleware = MessageSenderMiddleware(bot)
-    notification_sender_middleware = NotificationSenderMiddleware(bot, database_middleware.db, message_sender_middleware.message_sender)
+    notification_sender_middleware = NotificationSenderMiddleware(bot, database_middleware.pool, message_sender_middleware.message_sender)
+    job_runner_middleware = JobRunnerMiddleware(bot, database_middleware.pool)
+    await message_sender_middleware.message_sender.start()
+    await job_runner_middleware.job_runner.start()
     await notification_sender_middleware.startup()
+    await identity_middleware.startup()
 
     dp.update.outer_middleware(database_middleware)
+    dp.update.outer_middleware(identity_middleware)
     dp.update.outer_middleware(message_sender_middleware)
     dp.update.outer_middleware(notification_sender_middleware)
+    dp.update.outer_middleware(job_runner_middleware)
+
+    dp.include_router(jobs_router)
 
     dp.include_router(admin_router)
     dp.include_router(worker_router)
@@ -60,7 +96,16 @@ async def main():
     except Exception as e:
         logging.error(f"Bot stopped with error: {e}")
     finally:
+        await job_runner_middleware.job_runner.stop()
+        await notification_sender_middleware.notification_sender.stop()
+        await message_sender_middleware.message_sender.stop()
         await bot.session.close()
+        await loop_monitor.stop()
+        if partition_maintainer:
+            await partition_maintainer.stop()
+        db_executor.shutdown()
+        cpu_executor.shutdown()
+        pool.closeall()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _warm_up():
+    # Тяжёлые импорты выполняются один раз при запуске процесса, а не в первой задаче
+    import pandas  # noqa: F401
+    import xlsxwriter  # noqa: F401
+    import spreadsheets  # noqa: F401
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class CpuExecutor:
+    """
+    Пул процессов для CPU-работы с таблицами (pandas, xlsxwriter), чтобы она
+    не держала GIL процесса бота. Функции и их аргументы должны быть простыми:
+    через границу процессов передаются только байты и кортежи.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or int(os.getenv("CPU_EXECUTOR_WORKERS", min(2, os.cpu_count() or 1)))
+        self._executor = None
+
+    def start(self):
+        """
+        Запускает процессы заранее, пока в боте ещё нет рабочих потоков:
+        с fork все процессы создаются при первой отправке задачи.
+        """
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                             initializer=_warm_up)
+        for _ in range(self.max_workers):
+            self._executor.submit(_ready)
+
+    async def run(self, func, *args):
+        if self._executor is None:
+            self.start()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+cpu_executor = CpuExecutor()
@@ -0,0 +1,97 @@
+import copy
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+class ReferenceCache:
+    """
+    Кэш справочных данных (проекты, задачи, шрифты, должности, работники)
+    в памяти процесса. Записи живут ttl секунд и сбрасываются методами
+    *Operations, которые меняют соответствующие таблицы.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("REFERENCE_CACHE_TTL", 300))
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._generations: Dict[str, int] = {}
+        self._listeners: Dict[str, List[Callable[[], None]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, namespace: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+            generation = self._generations.get(namespace, 0)
+
+        value = loader()
+        with self._lock:
+            # Если справочник изменился во время загрузки, значение может быть устаревшим
+            if self._generations.get(namespace, 0) == generation:
+                self._entries[(namespace, key)] = (now + self.ttl, value)
+        return copy.deepcopy(value)
+
+    def invalidate(self, *namespaces: str):
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for cache_key in [k for k in self._entries if k[0] in namespaces]:
+                del self._entries[cache_key]
+            listeners = [listener for namespace in namespaces for listener in self._listeners.get(namespace, [])]
+
+        for listener in listeners:
+            listener()
+
+    def add_listener(self, namespace: str, listener: Callable[[], None]):
+        """Регистрирует функцию, вызываемую при сбросе справочника (например, для своих индексов)."""
+        with self._lock:
+            self._listeners.setdefault(namespace, []).append(listener)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+reference_cache = ReferenceCache()
+
+
+def cached(namespace: str):
+    """Кэширует результат метода *Operations по его аргументам (кроме db)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(db, *args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            return reference_cache.get_or_load(namespace, key, lambda: func(db, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidates(*namespaces: str):
+    """Сбрасывает кэш указанных справочников после вызова метода записи."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                reference_cache.invalidate(*namespaces)
+        return wrapper
+    return decorator
@@ -1,19 +1,38 @@
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+
 import psycopg2
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from dotenv import load_dotenv
 
+from data.executor import db_executor
+from data.partitioning import (create_partitioned_time_entry_table, ensure_partitions, is_partitioned,
+                               partitioning_mode)
+
 load_dotenv()
 
 
+def connection_params() -> dict:
+    return dict(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_DB"),
+    )
+
+
 class Database:
-    def __init__(self):
-        self.conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_DB"),
-        )
+    def __init__(self, conn=None):
+        self.conn = conn if conn is not None else psycopg2.connect(**connection_params())
+
+    async def run(self, func, *args, **kwargs):
+        """Выполняет func(self, *args, **kwargs) в пуле потоков БД, не блокируя event loop."""
+        return await db_executor.run(func, self, *args, **kwargs)
 
     def drop_all_tables(self):
         with self.conn.cursor() as cursor:
@@ -175,6 +194,15 @@ class Database:
         """)
 
     def create_time_entry_table(self, cursor):
+        granularity = partitioning_mode()
+        if granularity:
+            # Секционированная таблица создаётся только в новой БД;
+            # существующую переводит python -m data.partitioning
+            create_partitioned_time_entry_table(cursor)
+            if is_partitioned(cursor):
+                ensure_partitions(cursor, granularity)
+            return
+
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS time_entry (
                 id SERIAL PRIMARY KEY,
@@ -263,9 +291,94 @@ class Database:
         """)
 
 
-db = Database()
-
-# Инициализация таблиц
-# db.drop_all_tables()
-db.create_tables()
+class DatabasePool:
+    """
+    Пул соединений с БД. Каждое обновление получает своё соединение
+    (см. DatabaseMiddleware), поэтому диалоги разных пользователей не
+    делят одно соединение и не ждут друг друга.
+    """
+
+    def __init__(self, minconn: int = None, maxconn: int = None, timeout: float = None,
+                 health_check_interval: float = None):
+        self.minconn = minconn if minconn is not None else int(os.getenv("DB_POOL_MIN", 2))
+        self.maxconn = maxconn if maxconn is not None else int(os.getenv("DB_POOL_MAX", 20))
+        self.timeout = timeout if timeout is not None else float(os.getenv("DB_POOL_TIMEOUT", 30))
+        self.health_check_interval = (health_check_interval if health_check_interval is not None
+                                      else float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30)))
+
+        self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, **connection_params())
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._last_used = {}
+        # Ожидание свободного соединения блокирует поток, поэтому у него свой
+        # пул: потоки db_executor и пул по умолчанию нужны владельцам
+        # соединений, чтобы завершить запросы и вернуть соединение
+        self._waiters = ThreadPoolExecutor(max_workers=self.maxconn, thread_name_prefix="db-getconn")
+
+    def getconn(self) -> Database:
+        """Забирает соединение из пула, при необходимости ожидая освобождения."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"Не удалось получить соединение из пула за {self.timeout} с")
+
+        try:
+            conn = self._pool.getconn()
+            if not self._is_healthy(conn):
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        return Database(conn)
+
+    def putconn(self, db: Database):
+        """Возвращает соединение в пул. Незавершённая транзакция откатывается."""
+        try:
+            if db.conn.closed:
+                self._last_used.pop(id(db.conn), None)
+            else:
+                self._last_used[id(db.conn)] = time.monotonic()
+            self._pool.putconn(db.conn, close=bool(db.conn.closed))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        db = self.getconn()
+        try:
+            yield db
+        finally:
+            self.putconn(db)
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Асинхронный вариант connection(): ожидание соединения не блокирует event loop."""
+        loop = asyncio.get_running_loop()
+        db = await loop.run_in_executor(self._waiters, self.getconn)
+        try:
+            yield db
+        finally:
+            # putconn не ждёт, поэтому выполняется сразу
+            self.putconn(db)
+
+    def closeall(self):
+        self._waiters.shutdown(wait=True)
+        self._pool.closeall()
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            print(f"Соединение из пула недоступно, переподключение: {e}")
+            return False
 
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DatabaseExecutor:
+    """
+    Ограниченный пул потоков для блокирующих вызовов *Operations.
+    Обработчики не выполняют запросы в потоке event loop, а ожидают их здесь.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or int(os.getenv("DB_EXECUTOR_WORKERS", os.getenv("DB_POOL_MAX", 20)))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        submitted = time.monotonic()
+
+        def call():
+            started = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self.calls += 1
+                    self.total_wait += started - submitted
+                    self.total_run += finished - started
+                    self.max_run = max(self.max_run, finished - started)
+
+        return await loop.run_in_executor(self._executor, call)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "avg_wait_ms": self.total_wait / self.calls * 1000 if self.calls else 0.0,
+                "avg_run_ms": self.total_run / self.calls * 1000 if self.calls else 0.0,
+                "max_run_ms": self.max_run * 1000,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+db_executor = DatabaseExecutor()
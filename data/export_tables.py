@@ -1,51 +1,193 @@
-import csv
-import io
+import gzip
+import os
+import tempfile
 import zipfile
-from typing import List, Dict
-from psycopg2.extras import DictCursor
+from datetime import date
+from itertools import groupby
+from typing import BinaryIO, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg2 import sql
+
 from data.database import Database
 
 
+# Типы колонок time_entry_detail для Parquet. Текстовые колонки с небольшим
+# числом различных значений хранятся словарём
+DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+TIME_ENTRY_DETAIL_TYPES = {
+    "id": pa.int32(),
+    "entry_date": pa.date32(),
+    "hours": pa.float64(),
+    "worker_id": pa.int32(),
+    "worker_telegram_id": pa.int64(),
+    "worker_name": DICTIONARY,
+    "weekly_hours": pa.int32(),
+    "reminder_day": DICTIONARY,
+    "reminder_time": pa.time64("us"),
+    "can_receive_custom_tasks": pa.bool_(),
+    "can_receive_nonproject_tasks": pa.bool_(),
+    "position_id": pa.int32(),
+    "position_name": DICTIONARY,
+    "position_department": DICTIONARY,
+    "project_id": pa.int32(),
+    "project_name": DICTIONARY,
+    "project_type": DICTIONARY,
+    "project_status": DICTIONARY,
+    "task_id": pa.int32(),
+    "task_name": DICTIONARY,
+    "task_stage": DICTIONARY,
+    "task_department": DICTIONARY,
+    "task_is_unique": pa.bool_(),
+    "task_is_custom": pa.bool_(),
+    "task_is_nonproject": pa.bool_(),
+    "font_id": pa.int32(),
+    "font_name": DICTIONARY,
+    "project_task_id": pa.int32(),
+    "project_task_status": DICTIONARY,
+}
+
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
 class TableExporter:
     @staticmethod
     def get_all_tables(db: Database) -> List[str]:
         with db.conn.cursor() as cursor:
+            # Только обычные и секционированные таблицы: без представлений и
+            # без отдельных секций time_entry, иначе записи выгружаются дважды
             cursor.execute("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public'
+                SELECT c.relname
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'public'
+                  AND c.relkind IN ('r', 'p')
+                  AND NOT c.relispartition
+                ORDER BY c.relname
             """)
             return [row[0] for row in cursor.fetchall()]
 
     @staticmethod
-    def export_table_to_csv(db: Database, table_name: str) -> str:
-        with db.conn.cursor(cursor_factory=DictCursor) as cursor:
-            cursor.execute(f"SELECT * FROM {table_name}")
-            rows = cursor.fetchall()
+    def export_table_to_csv(db: Database, table_name: str, output: BinaryIO) -> None:
+        """Пишет таблицу в output в формате CSV через COPY, не загружая её в память"""
+        query = sql.SQL("COPY (SELECT * FROM {}) TO STDOUT WITH (FORMAT CSV, HEADER)").format(
+            sql.Identifier(table_name)
+        )
+        with db.conn.cursor() as cursor:
+            cursor.copy_expert(query, output)
+
+    @staticmethod
+    def export_all_tables_to_zip(db: Database, output: BinaryIO) -> None:
+        """Пишет zip-архив со всеми таблицами в output (например, во временный файл)"""
+        tables = TableExporter.get_all_tables(db)
+
+        try:
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                for table in tables:
+                    with zip_file.open(f"{table}.csv", 'w', force_zip64=True) as entry:
+                        TableExporter.export_table_to_csv(db, table, entry)
+        finally:
+            db.conn.rollback()
+
+    @staticmethod
+    def export_time_entry_detail(db: Database, output: BinaryIO, start_date: Optional[date] = None,
+                                 end_date: Optional[date] = None, project_id: Optional[int] = None,
+                                 department: Optional[str] = None) -> None:
+        """
+        Пишет time_entry_detail с фильтрами в output как CSV, сжатый gzip.
+        Строки передаются потоком через COPY и в памяти не накапливаются.
+        """
+        where, params = TableExporter._time_entry_detail_filter(start_date, end_date, project_id, department)
 
-            if not rows:
-                return ""
+        with db.conn.cursor() as cursor:
+            # COPY не принимает параметры, поэтому они подставляются через mogrify
+            select = cursor.mogrify(
+                f"SELECT * FROM time_entry_detail {where} ORDER BY entry_date, id", params
+            ).decode()
+            try:
+                with gzip.GzipFile(filename="time_entries_detail.csv", fileobj=output, mode='wb') as compressed:
+                    cursor.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT CSV, HEADER)", compressed)
+            finally:
+                db.conn.rollback()
 
-            output = io.StringIO()
-            writer = csv.writer(output)
+    @staticmethod
+    def export_time_entry_detail_parquet(db: Database, output: BinaryIO, start_date: Optional[date] = None,
+                                         end_date: Optional[date] = None, project_id: Optional[int] = None,
+                                         department: Optional[str] = None) -> None:
+        """
+        Пишет time_entry_detail с фильтрами в output как zip с Parquet-файлами,
+        по одному на месяц (month=ГГГГ-ММ/part.parquet). Строки читаются
+        серверным курсором и записываются группами строк по мере чтения.
+        """
+        where, params = TableExporter._time_entry_detail_filter(start_date, end_date, project_id, department)
 
-            writer.writerow([desc[0] for desc in cursor.description])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                with db.conn.cursor(name="time_entry_detail_parquet") as cursor:
+                    cursor.itersize = PARQUET_ROW_GROUP_SIZE
+                    cursor.execute(f"SELECT * FROM time_entry_detail {where} ORDER BY entry_date, id", params)
 
-            for row in rows:
-                writer.writerow(row)
+                    writer, month, schema, date_index = None, None, None, None
+                    while True:
+                        rows = cursor.fetchmany(PARQUET_ROW_GROUP_SIZE)
+                        if not rows:
+                            break
+                        if schema is None:
+                            columns = [desc[0] for desc in cursor.description]
+                            schema = pa.schema([
+                                (column, TIME_ENTRY_DETAIL_TYPES.get(column, pa.string())) for column in columns
+                            ])
+                            date_index = columns.index("entry_date")
 
-            return output.getvalue()
+                        # Строки отсортированы по дате, поэтому месяцы идут подряд
+                        for row_month, month_rows in groupby(rows, key=lambda r: r[date_index].strftime("%Y-%m")):
+                            if row_month != month:
+                                if writer:
+                                    writer.close()
+                                month = row_month
+                                month_dir = os.path.join(tmp_dir, f"month={month}")
+                                os.makedirs(month_dir)
+                                writer = pq.ParquetWriter(os.path.join(month_dir, "part.parquet"), schema)
+                            writer.write_table(TableExporter._rows_to_table(list(month_rows), schema))
+
+                    if writer:
+                        writer.close()
+            finally:
+                db.conn.rollback()
+
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as zip_file:
+                for month_dir in sorted(os.listdir(tmp_dir)):
+                    zip_file.write(os.path.join(tmp_dir, month_dir, "part.parquet"), f"{month_dir}/part.parquet")
 
     @staticmethod
-    def export_all_tables_to_zip(db: Database) -> io.BytesIO:
-        tables = TableExporter.get_all_tables(db)
-        zip_buffer = io.BytesIO()
+    def _rows_to_table(rows: list, schema: pa.Schema) -> pa.Table:
+        columns = []
+        for index, field in enumerate(schema):
+            values = [row[index] for row in rows]
+            if pa.types.is_dictionary(field.type):
+                columns.append(pa.array(values, pa.string()).dictionary_encode())
+            else:
+                columns.append(pa.array(values, field.type))
+        return pa.Table.from_arrays(columns, schema=schema)
 
-        with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zip_file:
-            for table in tables:
-                csv_data = TableExporter.export_table_to_csv(db, table)
-                if csv_data:
-                    zip_file.writestr(f"{table}.csv", csv_data)
+    @staticmethod
+    def _time_entry_detail_filter(start_date: Optional[date], end_date: Optional[date],
+                                  project_id: Optional[int], department: Optional[str]) -> Tuple[str, list]:
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("entry_date >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("entry_date <= %s")
+            params.append(end_date)
+        if project_id:
+            conditions.append("project_id = %s")
+            params.append(project_id)
+        if department:
+            conditions.append("task_department = %s")
+            params.append(department)
 
-        zip_buffer.seek(0)
-        return zip_buffer
\ No newline at end of file
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
@@ -0,0 +1,232 @@
+"""
+Версионированные миграции схемы БД.
+
+    python -m data.migrations           применить недостающие миграции
+    python -m data.migrations --status  показать текущую версию и ожидающие миграции
+
+Бот при старте только сверяет версию (check_schema) и схему не меняет.
+"""
+import argparse
+import logging
+from typing import List, Tuple
+
+from data.database import Database
+
+# Номер advisory-блокировки, чтобы два процесса не применяли миграции одновременно
+MIGRATIONS_LOCK_ID = 7_311_001
+
+# Миграции применяются по порядку, каждая в своей транзакции.
+# Уже применённые версии хранятся в таблице schema_version.
+# Версия 0 — исходная схема из Database.create_tables.
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (
+        1,
+        "Индексы time_entry/project_task и уникальность (worker, project_task, date)",
+        """
+        -- Дубликаты за один день объединяются: часы суммируются, комментарии склеиваются
+        WITH dup AS (
+            SELECT MIN(id) AS keep_id,
+                   SUM(hours) AS hours,
+                   string_agg(comment, '; ' ORDER BY id) AS comment
+            FROM time_entry
+            GROUP BY worker_id, project_task_id, entry_date
+            HAVING COUNT(*) > 1
+        )
+        UPDATE time_entry te
+        SET hours = dup.hours, comment = dup.comment
+        FROM dup
+        WHERE te.id = dup.keep_id;
+
+        DELETE FROM time_entry te
+        USING time_entry other
+        WHERE te.worker_id = other.worker_id
+          AND te.project_task_id = other.project_task_id
+          AND te.entry_date = other.entry_date
+          AND te.id > other.id;
+
+        ALTER TABLE time_entry
+            ADD CONSTRAINT time_entry_worker_task_date_key
+            UNIQUE (worker_id, project_task_id, entry_date);
+
+        CREATE INDEX IF NOT EXISTS time_entry_worker_date_idx
+            ON time_entry (worker_id, entry_date);
+
+        CREATE INDEX IF NOT EXISTS project_task_project_idx
+            ON project_task (project_id);
+        """,
+    ),
+    (
+        2,
+        "Недельные суммы time_entry_weekly по (работник, проект, ISO-неделя), поддерживаемые триггером",
+        """
+        -- Дневной разрез (работник, задача проекта, день) — это сама time_entry
+        -- благодаря уникальности из миграции 1, поэтому отдельной таблицы для него нет
+        CREATE TABLE time_entry_weekly (
+            worker_id INTEGER NOT NULL REFERENCES worker(id),
+            project_id INTEGER NOT NULL REFERENCES project(id),
+            week_start DATE NOT NULL,
+            hours DOUBLE PRECISION NOT NULL,
+            entries INTEGER NOT NULL,
+            PRIMARY KEY (worker_id, project_id, week_start)
+        );
+
+        CREATE INDEX time_entry_weekly_week_idx ON time_entry_weekly (week_start);
+
+        -- Для отчётов по периоду без фильтра по работнику
+        CREATE INDEX IF NOT EXISTS time_entry_entry_date_idx ON time_entry (entry_date);
+
+        CREATE OR REPLACE FUNCTION time_entry_weekly_apply(p_worker_id INTEGER, p_project_task_id INTEGER,
+                                                           p_entry_date DATE, p_hours DOUBLE PRECISION,
+                                                           p_entries INTEGER)
+        RETURNS VOID AS $$
+            INSERT INTO time_entry_weekly (worker_id, project_id, week_start, hours, entries)
+            SELECT p_worker_id, pt.project_id, date_trunc('week', p_entry_date)::date, p_hours, p_entries
+            FROM project_task pt
+            WHERE pt.id = p_project_task_id
+            ON CONFLICT (worker_id, project_id, week_start) DO UPDATE
+            SET hours = time_entry_weekly.hours + EXCLUDED.hours,
+                entries = time_entry_weekly.entries + EXCLUDED.entries;
+
+            DELETE FROM time_entry_weekly
+            WHERE worker_id = p_worker_id
+              AND week_start = date_trunc('week', p_entry_date)::date
+              AND entries = 0;
+        $$ LANGUAGE sql;
+
+        CREATE OR REPLACE FUNCTION time_entry_weekly_sync()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM time_entry_weekly_apply(OLD.worker_id, OLD.project_task_id, OLD.entry_date, -OLD.hours, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM time_entry_weekly_apply(NEW.worker_id, NEW.project_task_id, NEW.entry_date, NEW.hours, 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER time_entry_weekly_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON time_entry
+        FOR EACH ROW
+        EXECUTE FUNCTION time_entry_weekly_sync();
+
+        INSERT INTO time_entry_weekly (worker_id, project_id, week_start, hours, entries)
+        SELECT te.worker_id, pt.project_id, date_trunc('week', te.entry_date)::date, SUM(te.hours), COUNT(*)
+        FROM time_entry te
+        JOIN project_task pt ON pt.id = te.project_task_id
+        GROUP BY 1, 2, 3;
+        """,
+    ),
+]
+
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def create_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+    """)
+
+
+def current_version(db: Database) -> int:
+    """Версия схемы без изменений в БД: 0, если миграции ещё не применялись."""
+    with db.conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            version = 0
+        else:
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            version = cursor.fetchone()[0]
+    db.conn.rollback()
+    return version
+
+
+def pending_migrations(db: Database) -> List[Tuple[int, str, str]]:
+    version = current_version(db)
+    return [migration for migration in MIGRATIONS if migration[0] > version]
+
+
+def check_schema(db: Database) -> int:
+    """Проверка при старте: схема должна быть не старее миграций в коде."""
+    version = current_version(db)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Схема БД версии {version}, а требуется {LATEST_VERSION}. "
+            f"Примените миграции: python -m data.migrations"
+        )
+    if version > LATEST_VERSION:
+        logging.warning(f"Schema version {version} is newer than the latest known migration {LATEST_VERSION}")
+    return version
+
+
+def apply_migrations(db: Database) -> int:
+    """
+    Применяет ещё не применённые миграции. В пустой БД сначала создаётся
+    исходная схема. Возвращает итоговую версию схемы.
+    """
+    with db.conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_ID,))
+    db.conn.commit()
+
+    try:
+        version = current_version(db)
+        if version == 0:
+            db.create_tables()
+
+        with db.conn.cursor() as cursor:
+            create_version_table(cursor)
+        db.conn.commit()
+
+        for number, description, sql in MIGRATIONS:
+            if number <= version:
+                continue
+
+            with db.conn.cursor() as cursor:
+                try:
+                    cursor.execute(sql)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (number, description)
+                    )
+                    db.conn.commit()
+                except Exception as e:
+                    db.conn.rollback()
+                    print(f"Ошибка при применении миграции {number}: {e}")
+                    raise
+            print(f"Применена миграция {number}: {description}")
+            version = number
+    finally:
+        with db.conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_ID,))
+        db.conn.commit()
+
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции схемы БД")
+    parser.add_argument("--status", action="store_true", help="только показать версию и ожидающие миграции")
+    args = parser.parse_args()
+
+    db = Database()
+    try:
+        if args.status:
+            print(f"Версия схемы: {current_version(db)}, последняя миграция: {LATEST_VERSION}")
+            for number, description, _ in pending_migrations(db):
+                print(f"  ожидает: {number}. {description}")
+            return
+
+        version = apply_migrations(db)
+        print(f"Версия схемы: {version}")
+    finally:
+        db.conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Необязательное секционирование time_entry по entry_date (RANGE, по месяцам
+или по годам). Режим задаётся переменной TIME_ENTRY_PARTITIONING=month|year.
+
+Новая БД в этом режиме сразу создаётся секционированной
+(Database.create_time_entry_table). Существующую таблицу переводит команда
+
+    python -m data.partitioning month
+
+Секции создаются заранее на TIME_ENTRY_PARTITIONS_AHEAD периодов вперёд при
+старте и затем раз в сутки (PartitionMaintainer). Записи вне созданных
+секций попадают в time_entry_default и переносятся, когда секция появляется.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import date
+from typing import Optional
+
+GRANULARITIES = ("month", "year")
+
+DEFAULT_PARTITION = "time_entry_default"
+
+
+def partitioning_mode() -> Optional[str]:
+    mode = os.getenv("TIME_ENTRY_PARTITIONING", "").strip().lower()
+    if not mode:
+        return None
+    if mode not in GRANULARITIES:
+        raise ValueError(f"TIME_ENTRY_PARTITIONING должен быть одним из {GRANULARITIES}, а не {mode!r}")
+    return mode
+
+
+def partitions_ahead() -> int:
+    return int(os.getenv("TIME_ENTRY_PARTITIONS_AHEAD", 3))
+
+
+def create_partitioned_time_entry_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS time_entry (
+            id SERIAL,
+            project_task_id INTEGER NOT NULL REFERENCES project_task(id),
+            worker_id INTEGER NOT NULL REFERENCES worker(id),
+            entry_date DATE NOT NULL DEFAULT CURRENT_DATE,
+            hours DOUBLE PRECISION NOT NULL CHECK (hours > 0),
+            comment TEXT,
+            PRIMARY KEY (id, entry_date)
+        ) PARTITION BY RANGE (entry_date);
+    """)
+
+
+def is_partitioned(cursor) -> bool:
+    cursor.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('time_entry')
+        )
+    """)
+    return cursor.fetchone()[0]
+
+
+def period_start(day: date, granularity: str) -> date:
+    return date(day.year, day.month, 1) if granularity == "month" else date(day.year, 1, 1)
+
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: date, granularity: str) -> str:
+    return f"time_entry_y{start:%Y}m{start:%m}" if granularity == "month" else f"time_entry_y{start:%Y}"
+
+
+def ensure_partitions(cursor, granularity: str, since: Optional[date] = None, ahead: Optional[int] = None) -> int:
+    """
+    Создаёт недостающие секции с периода, содержащего since (по умолчанию
+    текущего), на ahead периодов вперёд и секцию по умолчанию. Строки из
+    секции по умолчанию, попадающие в новую секцию, переносятся через
+    родительскую таблицу, чтобы триггер недельных сумм учёл перенос.
+    Возвращает число созданных секций.
+    """
+    ahead = partitions_ahead() if ahead is None else ahead
+    today = date.today()
+
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF time_entry DEFAULT")
+
+    start = period_start(min(since or today, today), granularity)
+    last = period_start(today, granularity)
+    for _ in range(ahead):
+        last = next_period(last, granularity)
+
+    created = 0
+    while start <= last:
+        end = next_period(start, granularity)
+        name = partition_name(start, granularity)
+        cursor.execute("SELECT to_regclass(%s) IS NULL", (name,))
+        if cursor.fetchone()[0]:
+            cursor.execute(f"""
+                CREATE TEMP TABLE time_entry_moved AS
+                WITH moved AS (
+                    DELETE FROM {DEFAULT_PARTITION}
+                    WHERE entry_date >= %(start)s AND entry_date < %(end)s
+                    RETURNING *
+                )
+                SELECT * FROM moved
+            """, dict(start=start, end=end))
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF time_entry FOR VALUES FROM (%s) TO (%s)", (start, end)
+            )
+            cursor.execute("INSERT INTO time_entry SELECT * FROM time_entry_moved")
+            cursor.execute("DROP TABLE time_entry_moved")
+            created += 1
+        start = end
+
+    return created
+
+
+def partition_time_entry(db, granularity: str) -> int:
+    """
+    Переводит существующую обычную time_entry в секционированную в одной
+    транзакции: данные копируются в новую таблицу, индексы, ограничения,
+    триггер недельных сумм и представление time_entry_detail создаются
+    заново. На время переноса таблица заблокирована. Возвращает число строк.
+    """
+    with db.conn.cursor() as cursor:
+        try:
+            if is_partitioned(cursor):
+                print("Таблица time_entry уже секционирована")
+                return 0
+
+            cursor.execute("LOCK TABLE time_entry IN ACCESS EXCLUSIVE MODE")
+            cursor.execute("SELECT MIN(entry_date) FROM time_entry")
+            since = cursor.fetchone()[0]
+
+            # Имена ограничений и индексов уникальны в схеме, поэтому у старой
+            # таблицы они удаляются до создания новой
+            cursor.execute("""
+                DROP VIEW IF EXISTS time_entry_detail;
+                ALTER TABLE time_entry RENAME TO time_entry_unpartitioned;
+                ALTER SEQUENCE time_entry_id_seq OWNED BY NONE;
+                ALTER TABLE time_entry_unpartitioned
+                    DROP CONSTRAINT IF EXISTS time_entry_pkey,
+                    DROP CONSTRAINT IF EXISTS time_entry_worker_task_date_key;
+                DROP INDEX IF EXISTS time_entry_worker_date_idx;
+                DROP INDEX IF EXISTS time_entry_entry_date_idx;
+            """)
+
+            cursor.execute("""
+                CREATE TABLE time_entry (
+                    id INTEGER NOT NULL DEFAULT nextval('time_entry_id_seq'),
+                    project_task_id INTEGER NOT NULL REFERENCES project_task(id),
+                    worker_id INTEGER NOT NULL REFERENCES worker(id),
+                    entry_date DATE NOT NULL DEFAULT CURRENT_DATE,
+                    hours DOUBLE PRECISION NOT NULL CHECK (hours > 0),
+                    comment TEXT,
+                    PRIMARY KEY (id, entry_date),
+                    CONSTRAINT time_entry_worker_task_date_key UNIQUE (worker_id, project_task_id, entry_date)
+                ) PARTITION BY RANGE (entry_date);
+
+                ALTER SEQUENCE time_entry_id_seq OWNED BY time_entry.id;
+                CREATE INDEX time_entry_worker_date_idx ON time_entry (worker_id, entry_date);
+                CREATE INDEX time_entry_entry_date_idx ON time_entry (entry_date);
+            """)
+            ensure_partitions(cursor, granularity, since=since)
+
+            cursor.execute("""
+                INSERT INTO time_entry (id, project_task_id, worker_id, entry_date, hours, comment)
+                SELECT id, project_task_id, worker_id, entry_date, hours, comment
+                FROM time_entry_unpartitioned
+            """)
+            rows = cursor.rowcount
+
+            # Недельные суммы уже посчитаны по старой таблице, поэтому триггер
+            # подключается после копирования
+            cursor.execute("""
+                DROP TABLE time_entry_unpartitioned;
+                CREATE TRIGGER time_entry_weekly_trigger
+                AFTER INSERT OR UPDATE OR DELETE ON time_entry
+                FOR EACH ROW
+                EXECUTE FUNCTION time_entry_weekly_sync();
+            """)
+            db.create_time_entry_detail_view(cursor)
+            db.conn.commit()
+            return rows
+        except Exception as e:
+            db.conn.rollback()
+            print(f"Ошибка при секционировании time_entry: {e}")
+            raise
+
+
+class PartitionMaintainer:
+    """Раз в interval секунд создаёт секции time_entry на будущие периоды."""
+
+    def __init__(self, pool, granularity: str, interval: float = 24 * 3600):
+        self.pool = pool
+        self.granularity = granularity
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def maintain(self, db) -> int:
+        with db.conn.cursor() as cursor:
+            try:
+                if not is_partitioned(cursor):
+                    logging.warning("TIME_ENTRY_PARTITIONING задан, но time_entry не секционирована: "
+                                    "выполните python -m data.partitioning %s", self.granularity)
+                    db.conn.rollback()
+                    return 0
+                created = ensure_partitions(cursor, self.granularity)
+                db.conn.commit()
+                return created
+            except Exception:
+                db.conn.rollback()
+                raise
+
+    async def _run(self):
+        while True:
+            try:
+                async with self.pool.acquire() as db:
+                    created = await db.run(self.maintain)
+                if created:
+                    logging.info(f"Created {created} time_entry partitions")
+            except Exception:
+                logging.exception("Failed to create time_entry partitions")
+            await asyncio.sleep(self.interval)
+
+
+def main():
+    from data.database import Database
+    from data.migrations import check_schema
+
+    parser = argparse.ArgumentParser(description="Перевод time_entry в секционированную таблицу")
+    parser.add_argument("granularity", choices=GRANULARITIES)
+    args = parser.parse_args()
+
+    db = Database()
+    try:
+        # Перенос пересоздаёт триггер и индексы из миграций, поэтому они должны быть применены
+        check_schema(db)
+        rows = partition_time_entry(db, args.granularity)
+    finally:
+        db.conn.close()
+    print(f"Перенесено записей: {rows}")
+
+
+if __name__ == "__main__":
+    main()
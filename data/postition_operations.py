@@ -1,10 +1,12 @@
 from psycopg2.extras import DictCursor
+from data.cache import cached, invalidates
 from data.database import Database
 
 
 class PositionOperations:
 
     @staticmethod
+    @invalidates("position")
     def create_position(db: Database, name, department):
         with db.conn.cursor() as cursor:
             cursor.execute(
@@ -16,6 +18,7 @@ class PositionOperations:
             return position_id
 
     @staticmethod
+    @cached("position")
     def get_all_positions(db: Database):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("SELECT * FROM position")
@@ -1,13 +1,14 @@
 from typing import List, Dict, Any, Optional
-from psycopg2.extras import DictCursor
+from psycopg2.extras import DictCursor, execute_values
 
-from data.task_operations import TaskOperations
 from data.models import Status
+from data.cache import cached, invalidates
 from data.database import Database
 
 
 class ProjectOperations:
     @staticmethod
+    @invalidates("project", "task", "font")
     def create_project(db: Database, name: str, project_type: str, tasks_with_fonts: List[dict] = None,
                        unique_tasks_with_fonts: List[dict] = None,
                        status: str = Status.IN_PROGRESS.value) -> int:
@@ -18,72 +19,8 @@ class ProjectOperations:
                     (name, project_type, status))
                 project_id = cursor.fetchone()[0]
 
-                font_names = set()
-
-                if tasks_with_fonts:
-                    font_names.update(task['font_name'] for task in tasks_with_fonts
-                                      if task.get('font_name') is not None)
-
-                if unique_tasks_with_fonts:
-                    font_names.update(task['font_name'] for task in unique_tasks_with_fonts
-                                      if task.get('font_name') is not None)
-
-                font_name_to_id = {}
-                for font_name in font_names:
-                    cursor.execute(
-                        "SELECT id FROM font WHERE name = %s",
-                        (font_name,))
-                    font_row = cursor.fetchone()
-
-                    if font_row:
-                        font_id = font_row[0]
-                    else:
-                        cursor.execute(
-                            "INSERT INTO font (name) VALUES (%s) RETURNING id",
-                            (font_name,))
-                        font_id = cursor.fetchone()[0]
-
-                    font_name_to_id[font_name] = font_id
-
-                if tasks_with_fonts:
-                    for task_info in tasks_with_fonts:
-                        font_id = None
-                        if task_info.get('font_name') is not None:
-                            font_id = font_name_to_id.get(task_info['font_name'])
-
-                        cursor.execute(
-                            """INSERT INTO project_task 
-                            (project_id, task_id, font_id, comments) 
-                            VALUES (%s, %s, %s, %s)""",
-                            (project_id,
-                             task_info['task_id'],
-                             font_id,
-                             task_info.get('comments'))
-                        )
-
-                if unique_tasks_with_fonts:
-                    for unique_task in unique_tasks_with_fonts:
-                        task_id = TaskOperations.create_task(
-                            db,
-                            name=unique_task['name'],
-                            stage=unique_task.get('stage'),
-                            department=unique_task.get('department'),
-                            is_unique=True
-                        )
-
-                        font_id = None
-                        if unique_task.get('font_name') is not None:
-                            font_id = font_name_to_id.get(unique_task['font_name'])
-
-                        cursor.execute(
-                            """INSERT INTO project_task 
-                            (project_id, task_id, font_id, comments) 
-                            VALUES (%s, %s, %s, %s)""",
-                            (project_id,
-                             task_id,
-                             font_id,
-                             unique_task.get('comments'))
-                        )
+                ProjectOperations._insert_project_tasks(cursor, project_id, tasks_with_fonts,
+                                                        unique_tasks_with_fonts)
 
                 db.conn.commit()
                 return project_id
@@ -92,6 +29,101 @@ class ProjectOperations:
                 raise Exception(f"Ошибка при создании проекта: {e}")
 
     @staticmethod
+    @invalidates("task", "font")
+    def add_project_tasks(db: Database, project_id: int, tasks_with_fonts: List[dict] = None,
+                          unique_tasks_with_fonts: List[dict] = None) -> None:
+        with db.conn.cursor() as cursor:
+            try:
+                ProjectOperations._insert_project_tasks(cursor, project_id, tasks_with_fonts,
+                                                        unique_tasks_with_fonts)
+                db.conn.commit()
+            except Exception:
+                db.conn.rollback()
+                raise
+
+    @staticmethod
+    def _insert_project_tasks(cursor, project_id: int, tasks_with_fonts: List[dict] = None,
+                              unique_tasks_with_fonts: List[dict] = None) -> None:
+        """
+        Добавляет задачи в проект пачкой, без коммита: шрифты создаются и
+        находятся одним запросом, уникальные задачи и project_task
+        вставляются многострочными INSERT.
+        """
+        tasks_with_fonts = tasks_with_fonts or []
+        unique_tasks_with_fonts = unique_tasks_with_fonts or []
+
+        font_names = {task['font_name'] for task in tasks_with_fonts + unique_tasks_with_fonts
+                      if task.get('font_name') is not None}
+        font_name_to_id = ProjectOperations._upsert_fonts(cursor, font_names)
+
+        rows = [
+            (project_id, task_info['task_id'], font_name_to_id.get(task_info.get('font_name')),
+             task_info.get('comments'))
+            for task_info in tasks_with_fonts
+        ]
+
+        if unique_tasks_with_fonts:
+            # RETURNING не гарантирует порядок VALUES, поэтому id задач берутся
+            # из последовательности заранее и сопоставляются по номеру строки
+            task_ids = dict(execute_values(
+                cursor,
+                """
+                WITH v (ord, name, stage, department) AS (VALUES %s),
+                numbered AS MATERIALIZED (
+                    SELECT ord, nextval(pg_get_serial_sequence('task', 'id')) AS id, name, stage, department
+                    FROM v
+                ),
+                inserted AS (
+                    INSERT INTO task (id, name, stage, department, is_unique)
+                    SELECT id, name, stage, department, TRUE FROM numbered
+                    RETURNING id
+                )
+                SELECT numbered.ord, numbered.id FROM numbered JOIN inserted USING (id)
+                """,
+                [(index,
+                  unique_task['name'],
+                  ProjectOperations._none_if_empty(unique_task.get('stage')),
+                  ProjectOperations._none_if_empty(unique_task.get('department')))
+                 for index, unique_task in enumerate(unique_tasks_with_fonts)],
+                page_size=len(unique_tasks_with_fonts),
+                fetch=True
+            ))
+            rows.extend(
+                (project_id, task_ids[index], font_name_to_id.get(unique_task.get('font_name')),
+                 unique_task.get('comments'))
+                for index, unique_task in enumerate(unique_tasks_with_fonts)
+            )
+
+        if rows:
+            execute_values(
+                cursor,
+                "INSERT INTO project_task (project_id, task_id, font_id, comments) VALUES %s",
+                rows,
+                page_size=1000
+            )
+
+    @staticmethod
+    def _upsert_fonts(cursor, font_names) -> Dict[str, int]:
+        if not font_names:
+            return {}
+
+        # DO UPDATE вместо DO NOTHING: RETURNING тогда отдаёт id и для шрифтов,
+        # которые параллельно добавила другая транзакция и не видно в снимке
+        cursor.execute("""
+            INSERT INTO font (name)
+            SELECT DISTINCT name FROM unnest(%s::text[]) AS name
+            ORDER BY name
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id, name
+        """, (list(font_names),))
+        return {name: font_id for font_id, name in cursor.fetchall()}
+
+    @staticmethod
+    def _none_if_empty(value):
+        return None if value == "None" or value is None else value
+
+    @staticmethod
+    @cached("project")
     def get_project(db: Database, project_id):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute(
@@ -101,6 +133,7 @@ class ProjectOperations:
             return cursor.fetchone()
 
     @staticmethod
+    @cached("project")
     def get_all_projects(db: Database):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute(
@@ -109,6 +142,7 @@ class ProjectOperations:
             return cursor.fetchall()
 
     @staticmethod
+    @cached("project")
     def get_active_projects(db: Database) -> List[Dict[str, Any]]:
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -120,6 +154,7 @@ class ProjectOperations:
             return [dict(row) for row in cursor.fetchall()]
 
     @staticmethod
+    @cached("project")
     def get_project_by_id(db: Database, project_id: int) -> Dict[str, Any]:
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -159,19 +194,18 @@ class ProjectOperations:
             return dict(result) if result else None
 
     @staticmethod
+    @cached("project")
     def get_project_name(db: Database, project_id: int) -> str:
+        # Ошибки БД пробрасываются, чтобы кэш не запомнил пустое название
         with db.conn.cursor() as cursor:
-            try:
-                cursor.execute("""
-                    SELECT name FROM project WHERE id = %s
-                """, (project_id,))
-                result = cursor.fetchone()
-                return result[0] if result else ""
-            except Exception as e:
-                print(f"Ошибка при получении названия проекта: {e}")
-                return ""
+            cursor.execute("""
+                SELECT name FROM project WHERE id = %s
+            """, (project_id,))
+            result = cursor.fetchone()
+            return result[0] if result else ""
 
     @staticmethod
+    @cached("project")
     def get_custom_project(db: Database):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -182,6 +216,7 @@ class ProjectOperations:
             return dict(cursor.fetchone())
 
     @staticmethod
+    @cached("project")
     def get_nonproject_project(db: Database):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -204,14 +239,15 @@ class ProjectOperations:
             return cursor.fetchall()
 
     @staticmethod
-    def get_available_projects(db: Database, worker_id: int) -> List[Dict[str, Any]]:
+    @cached("project")
+    def get_available_projects(db: Database) -> List[Dict[str, Any]]:
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
                 SELECT p.id, p.name 
                 FROM project p
                 WHERE p.status = 'в работе' AND p.type != 'для кастома'
                 ORDER BY p.name
-            """, (worker_id,))
+            """)
             return [dict(row) for row in cursor.fetchall()]
 
     @staticmethod
@@ -327,6 +363,7 @@ class ProjectOperations:
             db.conn.commit()
 
     @staticmethod
+    @invalidates("project")
     def update_project_status(db: Database, project_id: int, new_status: str) -> None:
         with db.conn.cursor() as cursor:
             valid_statuses = [status.value for status in Status]
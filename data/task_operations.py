@@ -1,10 +1,12 @@
 from psycopg2.extras import DictCursor
+from data.cache import cached, invalidates
 from data.database import Database
 
 
 class TaskOperations:
 
     @staticmethod
+    @invalidates("task")
     def create_task(db: Database, name, stage, department, is_unique=False, is_nonproject=False, is_custom=False):
         with db.conn.cursor() as cursor:
             stage = None if stage == "None" or stage is None else stage
@@ -19,6 +21,7 @@ class TaskOperations:
             return task_id
 
     @staticmethod
+    @cached("task")
     def get_task(db: Database, task_id):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute(
@@ -28,6 +31,7 @@ class TaskOperations:
             return cursor.fetchone()
 
     @staticmethod
+    @cached("task")
     def get_task_by_id(db: Database, task_id):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute(
@@ -39,6 +43,7 @@ class TaskOperations:
             return result
 
     @staticmethod
+    @cached("task")
     def get_tasks_by_stage(db: Database, stage: str):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             stage = None if stage == "None" else stage
@@ -52,6 +57,7 @@ class TaskOperations:
             return [dict(row) for row in cursor.fetchall()]
 
     @staticmethod
+    @cached("task")
     def get_task_name(db: Database, task_id):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute(
@@ -83,6 +89,7 @@ class TaskOperations:
             return cursor.fetchone()
 
     @staticmethod
+    @invalidates("task")
     def add_custom_task(db: Database, task_name, font_id):
         with db.conn.cursor() as cursor:
             try:
@@ -119,6 +126,7 @@ class TaskOperations:
                 return None
 
     @staticmethod
+    @invalidates("task")
     def add_nonproject_task(db: Database, task_name, department):
         with db.conn.cursor() as cursor:
             try:
@@ -156,6 +164,7 @@ class TaskOperations:
 
 
     @staticmethod
+    @cached("task")
     def get_custom_tasks(db: Database):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -167,6 +176,7 @@ class TaskOperations:
             return [dict(row) for row in cursor.fetchall()]
 
     @staticmethod
+    @cached("task")
     def get_nonproject_tasks(db: Database):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import date
+from typing import List
 from psycopg2.extras import DictCursor
 
 from data.database import Database
@@ -6,48 +7,120 @@ from data.database import Database
 
 class TimeEntryOperations:
     @staticmethod
-    def get_time_entries(db: Database, worker_id, project_id=None, task_id=None, font_id=None,
-                         start_date: datetime = None,
-                         end_date: datetime = None, limit=None):
+    def _page_clause(params: list, before=None, limit=None) -> str:
+        """
+        Keyset-пагинация по (entry_date, id) от новых записей к старым.
+        before - ключ последней записи предыдущей страницы.
+        """
+        clause = ""
+        if before is not None:
+            clause += " AND (te.entry_date, te.id) < (%s, %s)"
+            params.extend(before)
+        clause += " ORDER BY te.entry_date DESC, te.id DESC"
+        if limit is not None:
+            clause += " LIMIT %s"
+            params.append(limit)
+        return clause
+
+    @staticmethod
+    def get_time_entries_detailed(db: Database, worker_id, start_date: date = None,
+                                  end_date: date = None, before=None, limit=None):
+        """
+        Записи работника вместе с названиями проекта, задачи и шрифта одним запросом.
+        Сортировка от новых к старым; before - ключ (entry_date, id) последней записи
+        предыдущей страницы для keyset-пагинации.
+        Границы периода — даты, а не datetime: сравнение entry_date с timestamp
+        не даёт планировщику отсечь секции time_entry.
+        """
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             query = """
-                    SELECT te.id, te.project_task_id, te.worker_id, te.entry_date, te.hours,
-                           pt.project_id, pt.task_id, pt.font_id
+                    SELECT te.id, te.project_task_id, te.worker_id, te.entry_date, te.hours, te.comment,
+                           pt.project_id, pt.task_id, pt.font_id,
+                           p.name AS project_name, t.name AS task_name, f.name AS font_name
                     FROM time_entry te
                     JOIN project_task pt ON te.project_task_id = pt.id
+                    JOIN project p ON pt.project_id = p.id
+                    JOIN task t ON pt.task_id = t.id
+                    LEFT JOIN font f ON pt.font_id = f.id
                     WHERE te.worker_id = %s
                 """
             params = [worker_id]
 
-            if project_id is not None:
-                query += " AND pt.project_id = %s"
-                params.append(project_id)
-            if task_id is not None:
-                query += " AND pt.task_id = %s"
-                params.append(task_id)
-            if font_id is not None:
-                query += " AND pt.font_id = %s"
-                params.append(font_id)
             if start_date is not None:
                 query += " AND te.entry_date >= %s"
                 params.append(start_date)
             if end_date is not None:
-                end_date = end_date.replace(hour=23, minute=59, second=59)
                 query += " AND te.entry_date <= %s"
                 params.append(end_date)
-            if limit is not None:
-                query += " LIMIT %s"
-                params.append(limit)
+            query += TimeEntryOperations._page_clause(params, before, limit)
 
             cursor.execute(query, tuple(params))
-            return cursor.fetchall()
+            return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def get_time_entry_detailed(db: Database, entry_id):
+        with db.conn.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute(
+                """
+                SELECT te.id, te.project_task_id, te.worker_id, te.entry_date, te.hours, te.comment,
+                       pt.project_id, pt.task_id, pt.font_id,
+                       p.name AS project_name, t.name AS task_name, f.name AS font_name
+                FROM time_entry te
+                JOIN project_task pt ON te.project_task_id = pt.id
+                JOIN project p ON pt.project_id = p.id
+                JOIN task t ON pt.task_id = t.id
+                LEFT JOIN font f ON pt.font_id = f.id
+                WHERE te.id = %s
+                """,
+                (entry_id,)
+            )
+            result = cursor.fetchone()
+            return dict(result) if result else None
+
+    @staticmethod
+    def get_time_summary(db: Database, worker_id, start_date: date, end_date: date):
+        """Сумма часов работника за период по проекту, задаче и шрифту."""
+        return TimeEntryOperations.get_time_summaries(db, [worker_id], start_date, end_date)
+
+    @staticmethod
+    def get_time_summaries(db: Database, worker_ids: List[int], start_date: date, end_date: date):
+        """То же, что get_time_summary, для нескольких работников одним запросом."""
+        with db.conn.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute(
+                """
+                SELECT te.worker_id,
+                       p.id AS project_id, p.name AS project_name,
+                       t.id AS task_id, t.name AS task_name,
+                       f.name AS font_name,
+                       SUM(te.hours) AS hours
+                FROM time_entry te
+                JOIN project_task pt ON te.project_task_id = pt.id
+                JOIN project p ON pt.project_id = p.id
+                JOIN task t ON pt.task_id = t.id
+                LEFT JOIN font f ON pt.font_id = f.id
+                WHERE te.worker_id = ANY(%s)
+                AND te.entry_date BETWEEN %s AND %s
+                GROUP BY te.worker_id, p.id, p.name, t.id, t.name, f.name
+                ORDER BY te.worker_id, p.name, p.id, t.name, f.name
+                """,
+                (list(worker_ids), start_date, end_date)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     @staticmethod
     def add_time_entry(db: Database, time_entry_data):
+        """Повторная запись на ту же задачу за тот же день добавляет часы к существующей"""
         with db.conn.cursor() as cursor:
             cursor.execute(
                 """INSERT INTO time_entry (project_task_id, worker_id, entry_date, hours, comment) 
-                VALUES (%s, %s, %s, %s, %s)""",
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (worker_id, project_task_id, entry_date) DO UPDATE
+                SET hours = time_entry.hours + EXCLUDED.hours,
+                    comment = CASE
+                        WHEN time_entry.comment IS NULL THEN EXCLUDED.comment
+                        WHEN EXCLUDED.comment IS NULL THEN time_entry.comment
+                        ELSE time_entry.comment || '; ' || EXCLUDED.comment
+                    END""",
                 (time_entry_data["project_task_id"],
                  time_entry_data["worker_id"],
                  time_entry_data["entry_date"],
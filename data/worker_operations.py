@@ -1,11 +1,13 @@
 from typing import List, Dict, Any
 from psycopg2.extras import DictCursor
 
+from data.cache import cached, invalidates
 from data.database import Database
 
 
 class WorkerOperations:
     @staticmethod
+    @invalidates("worker")
     def create_worker(db: Database, name, telegram_id, position_id, weekly_hours, can_receive_custom_tasks=False,
                       can_receive_nonproject_tasks=False, reminder_day="пятница", reminder_time="17:00:00"):
         with db.conn.cursor() as cursor:
@@ -22,6 +24,7 @@ class WorkerOperations:
             return worker_id
 
     @staticmethod
+    @cached("worker")
     def get_worker(db: Database, worker_id):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -44,6 +47,7 @@ class WorkerOperations:
             return dict(worker) if worker else None
 
     @staticmethod
+    @invalidates("worker")
     def update_worker(db: Database, worker_id, name=None, position_id=None, weekly_hours=None,
                       can_receive_custom_tasks=None,
                       can_receive_nonproject_tasks=None, reminder_day=None, reminder_time=None):
@@ -82,6 +86,7 @@ class WorkerOperations:
             db.conn.commit()
 
     @staticmethod
+    @cached("worker")
     def get_all_workers(db: Database):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
@@ -103,6 +108,17 @@ class WorkerOperations:
             return cursor.fetchall()
 
     @staticmethod
+    def get_workers_by_ids(db: Database, worker_ids: List[int]) -> List[Dict[str, Any]]:
+        with db.conn.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute("""
+                SELECT id, telegram_id, name, reminder_day, reminder_time
+                FROM worker
+                WHERE id = ANY(%s)
+            """, (list(worker_ids),))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    @cached("worker")
     def get_worker_by_telegram_id(db: Database, telegram_id: int):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute(
@@ -161,6 +177,7 @@ class WorkerOperations:
             db.conn.commit()
 
     @staticmethod
+    @invalidates("worker")
     def update_worker_reminder_settings(db: Database, worker_id: int, day: str, time: str):
         with db.conn.cursor() as cursor:
             cursor.execute(
@@ -173,11 +190,9 @@ class WorkerOperations:
     def get_worker_projects(db: Database, worker_id):
         with db.conn.cursor(cursor_factory=DictCursor) as cursor:
             cursor.execute("""
-                SELECT DISTINCT p.*
+                SELECT p.*
                 FROM project p
-                JOIN project_task pt ON p.id = pt.project_id
-                JOIN time_entry te ON pt.id = te.project_task_id
-                WHERE te.worker_id = %s
+                WHERE p.id IN (SELECT project_id FROM time_entry_weekly WHERE worker_id = %s)
                 ORDER BY p.name
             """, (worker_id,))
             return cursor.fetchall()
@@ -22,7 +22,7 @@ async def get_fonts(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data["db"]
 
     return {
-        "fonts": FontOperations.get_fonts(db),
+        "fonts": await db.run(FontOperations.get_fonts),
     }
 
 
@@ -54,7 +54,7 @@ async def on_confirm(callback: Any, widget: Any, manager: DialogManager):
     task_name = manager.dialog_data["task_name"]
     font_id = manager.dialog_data["font_id"]
 
-    task_id = TaskOperations.add_custom_task(db, task_name, font_id)
+    task_id = await db.run(TaskOperations.add_custom_task, task_name, font_id)
 
     if task_id:
         await callback.message.answer(f"Кастомная задача '{task_name}' успешно добавлена!")
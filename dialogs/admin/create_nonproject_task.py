@@ -34,7 +34,7 @@ async def on_confirm(callback: Any, widget: Any, dialog_manager: DialogManager):
     task_name = dialog_manager.dialog_data["task_name"]
     department = dialog_manager.dialog_data["department"]
 
-    task_id = TaskOperations.add_nonproject_task(db, task_name, department)
+    task_id = await db.run(TaskOperations.add_nonproject_task, task_name, department)
 
     if task_id:
         await callback.message.answer(
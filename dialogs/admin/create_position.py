@@ -46,7 +46,7 @@ async def create_position(callback: CallbackQuery, widget: Any, dialog_manager:
 
     db = dialog_manager.middleware_data["db"]
     try:
-        position_id = PositionOperations.create_position(db, name=name, department=department)
+        position_id = await db.run(PositionOperations.create_position, name=name, department=department)
         await callback.answer(f"Должность '{name}' успешно создана (ID: {position_id})")
     except Exception as e:
         await callback.answer(f"Ошибка при создании должности: {str(e)}")
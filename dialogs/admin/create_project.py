@@ -36,7 +36,7 @@ async def project_confirm_getter(dialog_manager: DialogManager, **kwargs):
         task_id = int(parts[0])
         font_name = parts[1] if len(parts) > 1 and parts[1] != "NONE" else "Без шрифта"
 
-        task = TaskOperations.get_task_by_id(db, task_id)
+        task = await db.run(TaskOperations.get_task_by_id, task_id)
         if not task:
             continue
 
@@ -93,7 +93,7 @@ async def project_getter(dialog_manager: DialogManager, **kwargs):
 
     tasks = []
     if stage:
-        tasks = TaskOperations.get_tasks_by_stage(db, stage)
+        tasks = await db.run(TaskOperations.get_tasks_by_stage, stage)
         for task in tasks:
             task['font_name'] = current_font_name
 
@@ -224,7 +224,8 @@ async def create_project(callback: CallbackQuery, widget: Any, dialog_manager: D
         })
 
     try:
-        project_id = ProjectOperations.create_project(db,
+        project_id = await db.run(
+            ProjectOperations.create_project,
             name=name,
             project_type=project_type,
             tasks_with_fonts=tasks_with_fonts,
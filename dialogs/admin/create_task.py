@@ -60,7 +60,7 @@ async def create_task(callback: CallbackQuery, widget: Any, dialog_manager: Dial
 
     db = dialog_manager.middleware_data["db"]
     try:
-        TaskOperations.create_task(db, name=name, stage=stage, department=department)
+        await db.run(TaskOperations.create_task, name=name, stage=stage, department=department)
         await callback.answer("Задача успешно создана")
     except Exception as e:
         await callback.answer(f"Ошибка при создании задачи: {str(e)}")
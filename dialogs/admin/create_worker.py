@@ -30,7 +30,7 @@ async def worker_getter(dialog_manager: DialogManager, **kwargs):
     department = data.get("department")
     position_id = data.get("position_id")
 
-    all_positions = PositionOperations.get_all_positions(db)
+    all_positions = await db.run(PositionOperations.get_all_positions)
 
     if department:
         positions = [p for p in all_positions if p['department'] == department]
@@ -119,14 +119,14 @@ async def create_worker(callback: CallbackQuery, widget: Any, dialog_manager: Di
     db = dialog_manager.middleware_data["db"]
 
     try:
-        worker_id = WorkerOperations.create_worker(db,
-                                  name=data["name"],
-                                  telegram_id=data["telegram_id"],
-                                  position_id=data["position_id"],
-                                  weekly_hours=data["weekly_hours"],
-                                  can_receive_custom_tasks=data.get("can_receive_custom_tasks", False),
-                                  can_receive_nonproject_tasks=data.get("can_receive_nonproject_tasks", False)
-                                  )
+        worker_id = await db.run(WorkerOperations.create_worker,
+                                 name=data["name"],
+                                 telegram_id=data["telegram_id"],
+                                 position_id=data["position_id"],
+                                 weekly_hours=data["weekly_hours"],
+                                 can_receive_custom_tasks=data.get("can_receive_custom_tasks", False),
+                                 can_receive_nonproject_tasks=data.get("can_receive_nonproject_tasks", False)
+                                 )
         await callback.answer(f"Сотрудник успешно добавлен (ID: {worker_id})")
     except Exception as e:
         await callback.answer(f"Ошибка при добавлении сотрудника: {str(e)}")
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 from aiogram.fsm.state import StatesGroup, State
 from aiogram_dialog import DialogManager, Window, Dialog
 from aiogram_dialog.widgets.kbd import Button, Row, Back, Cancel
@@ -6,6 +6,7 @@ from aiogram_dialog.widgets.text import Const, Format, Multi
 from aiogram.types import CallbackQuery, Message
 from aiogram_dialog.widgets.input import MessageInput
 
+from data.database import Database
 from data.models import Status
 from data.project_operations import ProjectOperations
 from data.task_operations import TaskOperations
@@ -30,7 +31,7 @@ class EditProjectState(StatesGroup):
 # Геттеры данных
 async def get_projects(dialog_manager: DialogManager, **kwargs) -> Dict[str, Any]:
     db = dialog_manager.middleware_data["db"]
-    projects = ProjectOperations.get_all_projects(db)
+    projects = await db.run(ProjectOperations.get_all_projects)
     return {
         "projects": [(str(p["id"]), p["name"]) for p in projects]
     }
@@ -39,7 +40,7 @@ async def get_projects(dialog_manager: DialogManager, **kwargs) -> Dict[str, Any
 async def get_project_info(dialog_manager: DialogManager, **kwargs) -> Dict[str, Any]:
     db = dialog_manager.middleware_data["db"]
     project_id = dialog_manager.current_context().dialog_data["project_id"]
-    project = ProjectOperations.get_project_by_id(db, project_id)
+    project = await db.run(ProjectOperations.get_project_by_id, project_id)
     return {
         "project_name": project["name"],
         "project_type": project["type"],
@@ -50,7 +51,7 @@ async def get_project_info(dialog_manager: DialogManager, **kwargs) -> Dict[str,
 async def get_project_stages(dialog_manager: DialogManager, **kwargs) -> Dict[str, Any]:
     db = dialog_manager.middleware_data["db"]
     project_id = dialog_manager.current_context().dialog_data["project_id"]
-    stages = ProjectOperations.get_project_stages(db, project_id)
+    stages = await db.run(ProjectOperations.get_project_stages, project_id)
 
     stage_items = [(stage, stage) for stage in stages if stage is not None]
     stage_items.append(("None", "Без этапа"))
@@ -66,7 +67,7 @@ async def get_stage_tasks(dialog_manager: DialogManager, **kwargs) -> Dict[str,
     project_id = dialog_manager.current_context().dialog_data["project_id"]
     stage = dialog_manager.current_context().dialog_data.get("stage")
 
-    tasks = ProjectOperations.get_project_tasks_by_stage(db, project_id, stage)
+    tasks = await db.run(ProjectOperations.get_project_tasks_by_stage, project_id, stage)
 
     formatted_tasks = []
     for task in tasks:
@@ -93,7 +94,7 @@ async def get_font_selection_data(dialog_manager: DialogManager, **kwargs) -> Di
 async def get_status_data(dialog_manager: DialogManager, **kwargs) -> Dict[str, Any]:
     db = dialog_manager.middleware_data["db"]
     project_id = dialog_manager.current_context().dialog_data["project_id"]
-    project = ProjectOperations.get_project_by_id(db, project_id)
+    project = await db.run(ProjectOperations.get_project_by_id, project_id)
 
     statuses = []
     for status in Status:
@@ -134,7 +135,7 @@ async def get_add_tasks_data(dialog_manager: DialogManager, **kwargs) -> Dict[st
 
     tasks = []
     if stage:
-        tasks = TaskOperations.get_tasks_by_stage(db, stage)
+        tasks = await db.run(TaskOperations.get_tasks_by_stage, stage)
         for task in tasks:
             task['font_name'] = current_font_name
 
@@ -189,48 +190,21 @@ async def on_unique_task_name_entered(message: Message, widget: MessageInput, ma
     db = manager.middleware_data["db"]
     project_id = data["project_id"]
 
-    with db.conn.cursor() as cursor:
-        try:
-            font_id = None
-            if current_font_name and current_font_name != "Без шрифта":
-                cursor.execute(
-                    "SELECT id FROM font WHERE name = %s",
-                    (current_font_name,))
-                font_row = cursor.fetchone()
-
-                if font_row:
-                    font_id = font_row[0]
-                else:
-                    cursor.execute(
-                        "INSERT INTO font (name) VALUES (%s) RETURNING id",
-                        (current_font_name,))
-                    font_id = cursor.fetchone()[0]
-
-            for unique_task in unique_tasks:
-                task_id = TaskOperations.create_task(
-                    db,
-                    name=unique_task['name'],
-                    stage=unique_task.get('stage'),
-                    department=unique_task.get('department'),
-                    is_unique=True
-                )
-
-                cursor.execute(
-                    """INSERT INTO project_task 
-                    (project_id, task_id, font_id, comments) 
-                    VALUES (%s, %s, %s, %s)""",
-                    (project_id,
-                     task_id,
-                     font_id,
-                     unique_task.get('comments'))
-                )
-
-            db.conn.commit()
-            await message.answer(f"Добавлены {len(task_names)} задачи в отдел {department or 'без отдела'}")
-            await manager.switch_to(EditProjectState.project_actions)
-        except Exception as e:
-            db.conn.rollback()
-            await message.answer(f"Ошибка при добавлении задач: {str(e)}", show_alert=True)
+    try:
+        await db.run(_add_unique_tasks, project_id, current_font_name, unique_tasks)
+        await message.answer(f"Добавлены {len(task_names)} задачи в отдел {department or 'без отдела'}")
+        await manager.switch_to(EditProjectState.project_actions)
+    except Exception as e:
+        await message.answer(f"Ошибка при добавлении задач: {str(e)}", show_alert=True)
+
+
+def _add_unique_tasks(db: Database, project_id: int, current_font_name: str, unique_tasks: List[dict]):
+    font_name = current_font_name if current_font_name and current_font_name != "Без шрифта" else None
+    ProjectOperations.add_project_tasks(
+        db, project_id,
+        unique_tasks_with_fonts=[dict(unique_task, font_name=font_name) for unique_task in unique_tasks]
+    )
+
 
 async def on_project_selected(c: CallbackQuery, select: Select, manager: DialogManager, item_id: str):
     manager.current_context().dialog_data["project_id"] = int(item_id)
@@ -244,8 +218,9 @@ async def on_stage_selected(c: CallbackQuery, select: Select, manager: DialogMan
 
 async def toggle_task_status(c: CallbackQuery, select: Select, manager: DialogManager, item_id: str):
     db = manager.middleware_data["db"]
-    new_status = 'в процессе' if ProjectOperations.get_project_task(db, item_id)['status'] == 'завершён' else 'завершён'
-    ProjectOperations.update_task_status(db, item_id, new_status)
+    project_task = await db.run(ProjectOperations.get_project_task, item_id)
+    new_status = 'в процессе' if project_task['status'] == 'завершён' else 'завершён'
+    await db.run(ProjectOperations.update_task_status, item_id, new_status)
     await c.answer(f"Статус изменён на: {new_status}")
     await manager.show()
 
@@ -255,14 +230,14 @@ async def toggle_stage_status(c: CallbackQuery, button: Button, manager: DialogM
     project_id = manager.current_context().dialog_data["project_id"]
     stage = manager.current_context().dialog_data.get("stage")
 
-    tasks = ProjectOperations.get_project_tasks_by_stage(db, project_id, stage)
+    tasks = await db.run(ProjectOperations.get_project_tasks_by_stage, project_id, stage)
     all_completed = all(t['status'] == 'завершён' for t in tasks)
     new_status = 'в процессе' if all_completed else 'завершён'
 
     if new_status == 'завершён':
-        ProjectOperations.complete_stage_tasks(db, project_id, stage)
+        await db.run(ProjectOperations.complete_stage_tasks, project_id, stage)
     else:
-        ProjectOperations.incomplete_stage_tasks(db, project_id, stage)
+        await db.run(ProjectOperations.incomplete_stage_tasks, project_id, stage)
 
     await c.answer(f"Все задачи этапа {'завершены' if new_status == 'завершён' else 'возобновлены'}")
     await manager.show()
@@ -271,7 +246,7 @@ async def toggle_stage_status(c: CallbackQuery, button: Button, manager: DialogM
 async def on_status_selected(c: CallbackQuery, radio: Radio, manager: DialogManager, item_id: str):
     db = manager.middleware_data["db"]
     project_id = manager.current_context().dialog_data["project_id"]
-    ProjectOperations.update_project_status(db, project_id, item_id)
+    await db.run(ProjectOperations.update_project_status, project_id, item_id)
     await c.answer(f"Статус проекта изменён на: {item_id}")
     await manager.show()
 
@@ -356,81 +331,20 @@ async def save_added_tasks(c: CallbackQuery, button: Button, manager: DialogMana
 
     unique_tasks = data.get("unique_tasks", [])
 
-    with db.conn.cursor() as cursor:
-        try:
-            # Добавляем шрифты, если они новые
-            font_names = set()
-            for task in tasks_with_fonts:
-                if task.get('font_name'):
-                    font_names.add(task['font_name'])
-
-            for task in unique_tasks:
-                if task.get('font_name'):
-                    font_names.add(task['font_name'])
-
-            font_name_to_id = {}
-            for font_name in font_names:
-                cursor.execute(
-                    "SELECT id FROM font WHERE name = %s",
-                    (font_name,))
-                font_row = cursor.fetchone()
-
-                if font_row:
-                    font_id = font_row[0]
-                else:
-                    cursor.execute(
-                        "INSERT INTO font (name) VALUES (%s) RETURNING id",
-                        (font_name,))
-                    font_id = cursor.fetchone()[0]
-
-                font_name_to_id[font_name] = font_id
-
-            if tasks_with_fonts:
-                for task_info in tasks_with_fonts:
-                    font_id = None
-                    if task_info.get('font_name') is not None:
-                        font_id = font_name_to_id.get(task_info['font_name'])
-
-                    cursor.execute(
-                        """INSERT INTO project_task 
-                        (project_id, task_id, font_id, comments) 
-                        VALUES (%s, %s, %s, %s)""",
-                        (project_id,
-                         task_info['task_id'],
-                         font_id,
-                         task_info.get('comments'))
-                    )
-
-            if unique_tasks:
-                for unique_task in unique_tasks:
-                    task_id = TaskOperations.create_task(
-                        db,
-                        name=unique_task['name'],
-                        stage=unique_task.get('stage'),
-                        department=unique_task.get('department'),
-                        is_unique=True
-                    )
-
-                    font_id = None
-                    if unique_task.get('font_name') is not None:
-                        font_id = font_name_to_id.get(unique_task['font_name'])
-
-                    cursor.execute(
-                        """INSERT INTO project_task 
-                        (project_id, task_id, font_id, comments) 
-                        VALUES (%s, %s, %s, %s)""",
-                        (project_id,
-                         task_id,
-                         font_id,
-                         unique_task.get('comments'))
-                    )
-
-            db.conn.commit()
-            await c.answer("Задача успешно добавлена в проект!")
-            await manager.show()
-        except Exception as e:
-            db.conn.rollback()
-            await c.answer(f"Ошибка при добавлении задач: {str(e)}", show_alert=True)
+    try:
+        await db.run(_add_tasks, project_id, tasks_with_fonts, unique_tasks)
+        await c.answer("Задача успешно добавлена в проект!")
+        await manager.show()
+    except Exception as e:
+        await c.answer(f"Ошибка при добавлении задач: {str(e)}", show_alert=True)
+
+
+def _add_tasks(db: Database, project_id: int, tasks_with_fonts: List[dict], unique_tasks: List[dict]):
+    ProjectOperations.add_project_tasks(
+        db, project_id,
+        tasks_with_fonts=tasks_with_fonts,
+        unique_tasks_with_fonts=[dict(task, font_name=task.get('font_name') or None) for task in unique_tasks]
+    )
 
 
 # Диалог
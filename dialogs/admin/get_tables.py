@@ -2,27 +2,42 @@ from aiogram.fsm.state import StatesGroup, State
 from aiogram_dialog import Dialog, Window, DialogManager
 from aiogram_dialog.widgets.kbd import Button
 from aiogram_dialog.widgets.text import Const
-from aiogram.types import CallbackQuery, BufferedInputFile
+from aiogram.types import CallbackQuery, FSInputFile
+import os
+import tempfile
 
 
-from data.export_tables import TableExporter
 from data.database import Database
+from data.export_tables import TableExporter
+from job_runner import Job
 
 class GetTablesState(StatesGroup):
     main = State()
 
 
 async def export_tables(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
-    db = Database()
-    zip_buffer = TableExporter.export_all_tables_to_zip(db)
-
-    zip_file = BufferedInputFile(zip_buffer.getvalue(), filename="tables_export.zip")
-
-    await callback.message.answer_document(
-        document=zip_file,
-        caption="Экспорт всех таблиц в формате CSV"
-    )
-
+    job_runner = dialog_manager.middleware_data["job_runner"]
+    chat_id = callback.message.chat.id
+
+    async def export(job: Job, db: Database):
+        # Архив пишется во временный файл, чтобы размер таблиц не влиял на память
+        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+            path = tmp.name
+        try:
+            with open(path, "wb") as output:
+                await db.run(TableExporter.export_all_tables_to_zip, output)
+
+            await job.progress("отправка архива")
+            await job.bot.send_document(
+                chat_id=chat_id,
+                document=FSInputFile(path, filename="tables_export.zip"),
+                caption="Экспорт всех таблиц в формате CSV"
+            )
+        finally:
+            os.remove(path)
+
+    await callback.answer()
+    await job_runner.submit(callback.from_user.id, chat_id, "Экспорт таблиц", export)
     await dialog_manager.done()
 
 
@@ -1,59 +1,207 @@
 from aiogram.fsm.state import StatesGroup, State
 from aiogram_dialog import Dialog, Window, DialogManager
-from aiogram_dialog.widgets.kbd import Button
-from aiogram_dialog.widgets.text import Const
-from aiogram.types import CallbackQuery, BufferedInputFile
-import pandas as pd
-import io
-import zipfile
+from aiogram_dialog.widgets.kbd import Button, Row, Cancel, Back
+from aiogram_dialog.widgets.text import Const, Format
+from aiogram_dialog.widgets.input import MessageInput
+from aiogram.types import CallbackQuery, FSInputFile, Message
+from datetime import date
+import os
+import re
+import tempfile
+
+from data.database import Database
+from data.export_tables import TableExporter
+from job_runner import Job
+from data.project_operations import ProjectOperations
+from widgets.Vertical import Select
 
 
 class TimeEntryExportState(StatesGroup):
     main = State()
+    period = State()
+    project = State()
+    department = State()
 
 
-async def export_time_entries(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
+DEPARTMENTS = [
+    ("шрифтовой", "Шрифтовой"),
+    ("технический", "Технический"),
+    ("графический", "Графический"),
+    ("контентный", "Контентный"),
+]
+
+
+async def filters_getter(dialog_manager: DialogManager, **kwargs):
+    data = dialog_manager.current_context().dialog_data
+    start_date, end_date = data.get("start_date"), data.get("end_date")
+
+    return {
+        "period": f"{_format_date(start_date)} - {_format_date(end_date)}" if start_date else "весь период",
+        "project": data.get("project_name", "все проекты"),
+        "department": data.get("department", "все отделы"),
+    }
+
+
+async def projects_getter(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data["db"]
+    projects = await db.run(ProjectOperations.get_all_projects)
+    return {"projects": [(project["id"], project["name"]) for project in projects]}
+
+
+def _format_date(value: str) -> str:
+    return date.fromisoformat(value).strftime("%d.%m.%Y")
 
+
+async def on_period_entered(message: Message, widget: MessageInput, dialog_manager: DialogManager):
+    match = re.fullmatch(r'(\d{2})\.(\d{2})\.(\d{4})\s*-\s*(\d{2})\.(\d{2})\.(\d{4})', message.text.strip())
     try:
-        with db.conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM time_entry_detail")
-            columns = [desc[0] for desc in cursor.description]
-            data = cursor.fetchall()
+        if not match:
+            raise ValueError("Неверный формат даты")
+        day1, month1, year1, day2, month2, year2 = map(int, match.groups())
+        start_date = date(year1, month1, day1)
+        end_date = date(year2, month2, day2)
+        if start_date > end_date:
+            raise ValueError("Дата начала должна быть раньше даты окончания")
+    except ValueError as e:
+        await message.answer(f"Ошибка: {str(e)}\nПожалуйста, введите даты в формате ДД.ММ.ГГГГ - ДД.ММ.ГГГГ")
+        return
+
+    data = dialog_manager.current_context().dialog_data
+    data["start_date"] = start_date.isoformat()
+    data["end_date"] = end_date.isoformat()
+    await dialog_manager.switch_to(TimeEntryExportState.main)
 
-            df = pd.DataFrame(data, columns=columns)
 
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
+async def on_project_selected(callback: CallbackQuery, select: Select, dialog_manager: DialogManager, item_id: str):
+    db = dialog_manager.middleware_data["db"]
+    data = dialog_manager.current_context().dialog_data
+    data["project_id"] = int(item_id)
+    data["project_name"] = await db.run(ProjectOperations.get_project_name, int(item_id))
+    await dialog_manager.switch_to(TimeEntryExportState.main)
 
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zip_file:
-                zip_file.writestr('time_entries_detail.csv', csv_buffer.getvalue())
 
-            zip_buffer.seek(0)
-            zip_file = BufferedInputFile(zip_buffer.getvalue(), filename="time_entries_export.zip")
+async def on_department_selected(callback: CallbackQuery, select: Select, dialog_manager: DialogManager,
+                                 item_id: str):
+    dialog_manager.current_context().dialog_data["department"] = item_id
+    await dialog_manager.switch_to(TimeEntryExportState.main)
 
-            await callback.message.answer_document(
-                document=zip_file,
-                caption="Экспорт данных о временных записях с детализацией"
-            )
 
-    except Exception as e:
-        await callback.message.answer(f"Ошибка при экспорте данных: {str(e)}")
+async def reset_filters(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
+    dialog_manager.current_context().dialog_data.clear()
+
+
+async def export_time_entries(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
+    await _export(callback, dialog_manager, TableExporter.export_time_entry_detail,
+                  "time_entries_export.csv.gz", "Экспорт данных о временных записях с детализацией")
+
 
+async def export_time_entries_parquet(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
+    await _export(callback, dialog_manager, TableExporter.export_time_entry_detail_parquet,
+                  "time_entries_export_parquet.zip",
+                  "Экспорт данных о временных записях в Parquet, по файлу на месяц")
+
+
+async def _export(callback: CallbackQuery, dialog_manager: DialogManager, export, filename: str, caption: str):
+    job_runner = dialog_manager.middleware_data["job_runner"]
+    data = dialog_manager.current_context().dialog_data
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+    project_id = data.get("project_id")
+    department = data.get("department")
+    chat_id = callback.message.chat.id
+
+    async def run_export(job: Job, db: Database):
+        # Выгрузка пишется во временный файл и не держит всю историю в памяти
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1], delete=False) as tmp:
+            path = tmp.name
+        try:
+            with open(path, "wb") as output:
+                await db.run(
+                    export,
+                    output,
+                    start_date=date.fromisoformat(start_date) if start_date else None,
+                    end_date=date.fromisoformat(end_date) if end_date else None,
+                    project_id=project_id,
+                    department=department,
+                )
+
+            await job.progress("отправка файла")
+            await job.bot.send_document(
+                chat_id=chat_id,
+                document=FSInputFile(path, filename=filename),
+                caption=caption
+            )
+        finally:
+            os.remove(path)
+
+    await callback.answer()
+    await job_runner.submit(callback.from_user.id, chat_id, "Экспорт временных записей", run_export)
     await dialog_manager.done()
 
 
 def get_time_entries_dialog():
     return Dialog(
         Window(
-            Const("Нажмите кнопку чтобы получить детализированные данные о временных записях в CSV формате"),
-            Button(
-                text=Const("Экспортировать данные о временных записях"),
-                id="export_time_entries",
-                on_click=export_time_entries,
+            Format(
+                "Детализированные данные о временных записях в CSV (gzip) или Parquet\n\n"
+                "Период: {period}\n"
+                "Проект: {project}\n"
+                "Отдел: {department}"
+            ),
+            Row(
+                Button(Const("📅 Период"), id="period", on_click=lambda c, b, m: m.switch_to(TimeEntryExportState.period)),
+                Button(Const("📁 Проект"), id="project", on_click=lambda c, b, m: m.switch_to(TimeEntryExportState.project)),
+                Button(Const("🏢 Отдел"), id="department",
+                       on_click=lambda c, b, m: m.switch_to(TimeEntryExportState.department)),
+            ),
+            Button(Const("🔄 Сбросить фильтры"), id="reset_filters", on_click=reset_filters),
+            Row(
+                Button(
+                    text=Const("Экспорт в CSV"),
+                    id="export_time_entries",
+                    on_click=export_time_entries,
+                ),
+                Button(
+                    text=Const("Экспорт в Parquet"),
+                    id="export_time_entries_parquet",
+                    on_click=export_time_entries_parquet,
+                ),
             ),
+            Cancel(Const("❌ Отмена")),
             state=TimeEntryExportState.main,
+            getter=filters_getter,
+        ),
+        Window(
+            Const("Введите период в формате ДД.ММ.ГГГГ - ДД.ММ.ГГГГ\nНапример: 01.01.2025 - 31.12.2025"),
+            MessageInput(on_period_entered, content_types=["text"]),
+            Back(Const("⬅️ Назад")),
+            state=TimeEntryExportState.period,
+        ),
+        Window(
+            Const("Выберите проект:"),
+            Select(
+                text=Format("{item[1]}"),
+                items="projects",
+                id="export_project_select",
+                item_id_getter=lambda x: x[0],
+                on_click=on_project_selected,
+            ),
+            Button(Const("⬅️ Назад"), id="back_from_project",
+                   on_click=lambda c, b, m: m.switch_to(TimeEntryExportState.main)),
+            state=TimeEntryExportState.project,
+            getter=projects_getter,
+        ),
+        Window(
+            Const("Выберите отдел:"),
+            Select(
+                text=Format("{item[1]}"),
+                items=DEPARTMENTS,
+                id="export_department_select",
+                item_id_getter=lambda x: x[0],
+                on_click=on_department_selected,
+            ),
+            Button(Const("⬅️ Назад"), id="back_from_department",
+                   on_click=lambda c, b, m: m.switch_to(TimeEntryExportState.main)),
+            state=TimeEntryExportState.department,
         ),
-    )
\ No newline at end of file
+    )
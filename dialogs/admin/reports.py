@@ -0,0 +1,200 @@
+from aiogram.fsm.state import StatesGroup, State
+from aiogram_dialog import Dialog, Window, DialogManager
+from aiogram_dialog.widgets.kbd import Button, Row, Cancel
+from aiogram_dialog.widgets.text import Const, Format
+from aiogram_dialog.widgets.input import MessageInput
+from aiogram.types import CallbackQuery, FSInputFile, Message
+from datetime import date
+import os
+import re
+import tempfile
+
+from data.database import Database
+from job_runner import Job
+from report_generator import GroupBy, Period, ReportFilter, ReportGenerator
+from widgets.Vertical import Select
+
+
+class ReportState(StatesGroup):
+    main = State()
+    period = State()
+    result = State()
+
+
+# Ключ отчёта -> (название, разрезы). План/факт строится отдельно
+REPORTS = {
+    "project": ("По проектам", (GroupBy.PROJECT,)),
+    "stage": ("По этапам", (GroupBy.STAGE,)),
+    "department": ("По отделам", (GroupBy.DEPARTMENT,)),
+    "font": ("По шрифтам", (GroupBy.FONT,)),
+    "worker": ("По сотрудникам", (GroupBy.WORKER,)),
+    "plan_fact": ("План / факт", None),
+}
+
+STEPS = {
+    "none": ("Без разбивки", None),
+    "week": ("По неделям", Period.WEEK),
+    "month": ("По месяцам", Period.MONTH),
+}
+
+# Сколько строк отчёта показывается в сообщении, остальное — в CSV
+MAX_ROWS_IN_MESSAGE = 30
+
+
+async def main_getter(dialog_manager: DialogManager, **kwargs):
+    data = dialog_manager.current_context().dialog_data
+    start_date, end_date = _period(data)
+    return {
+        "period": f"{start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')}",
+        "step": STEPS[data.get("step", "none")][0],
+        "reports": [(key, title) for key, (title, _) in REPORTS.items()],
+    }
+
+
+async def result_getter(dialog_manager: DialogManager, **kwargs):
+    db = dialog_manager.middleware_data["db"]
+    data = dialog_manager.current_context().dialog_data
+    report = await db.run(build_report, data)
+
+    header = report.header()
+    records = report.records()
+    lines = [" | ".join(_format_value(value) for value in record) for record in records[:MAX_ROWS_IN_MESSAGE]]
+    if len(records) > MAX_ROWS_IN_MESSAGE:
+        lines.append(f"… ещё строк: {len(records) - MAX_ROWS_IN_MESSAGE}, полный отчёт — в CSV")
+
+    return {
+        "title": REPORTS[data["report"]][0],
+        "header": " | ".join(header),
+        "rows": "\n".join(lines) if lines else "Нет данных за период",
+    }
+
+
+def build_report(db: Database, data: dict):
+    start_date, end_date = _period(data)
+    period = STEPS[data.get("step", "none")][1]
+    _, group_by = REPORTS[data["report"]]
+
+    if group_by is None:
+        return ReportGenerator.plan_vs_actual(db, start_date, end_date, period=period or Period.MONTH)
+    return ReportGenerator.hours(
+        db, group_by, ReportFilter(start_date=start_date, end_date=end_date), period=period
+    )
+
+
+def _period(data: dict):
+    today = date.today()
+    start_date = date.fromisoformat(data["start_date"]) if data.get("start_date") else today.replace(day=1)
+    end_date = date.fromisoformat(data["end_date"]) if data.get("end_date") else today
+    return start_date, end_date
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return "—"
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, date):
+        return value.strftime("%d.%m.%Y")
+    return str(value)
+
+
+async def on_period_entered(message: Message, widget: MessageInput, dialog_manager: DialogManager):
+    match = re.fullmatch(r'(\d{2})\.(\d{2})\.(\d{4})\s*-\s*(\d{2})\.(\d{2})\.(\d{4})', message.text.strip())
+    try:
+        if not match:
+            raise ValueError("Неверный формат даты")
+        day1, month1, year1, day2, month2, year2 = map(int, match.groups())
+        start_date = date(year1, month1, day1)
+        end_date = date(year2, month2, day2)
+        if start_date > end_date:
+            raise ValueError("Дата начала должна быть раньше даты окончания")
+    except ValueError as e:
+        await message.answer(f"Ошибка: {str(e)}\nПожалуйста, введите даты в формате ДД.ММ.ГГГГ - ДД.ММ.ГГГГ")
+        return
+
+    data = dialog_manager.current_context().dialog_data
+    data["start_date"] = start_date.isoformat()
+    data["end_date"] = end_date.isoformat()
+    await dialog_manager.switch_to(ReportState.main)
+
+
+async def on_step_clicked(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
+    data = dialog_manager.current_context().dialog_data
+    steps = list(STEPS)
+    data["step"] = steps[(steps.index(data.get("step", "none")) + 1) % len(steps)]
+
+
+async def on_report_selected(callback: CallbackQuery, select: Select, dialog_manager: DialogManager, item_id: str):
+    dialog_manager.current_context().dialog_data["report"] = item_id
+    await dialog_manager.switch_to(ReportState.result)
+
+
+async def export_report(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
+    job_runner = dialog_manager.middleware_data["job_runner"]
+    data = dict(dialog_manager.current_context().dialog_data)
+    chat_id = callback.message.chat.id
+
+    async def run_export(job: Job, db: Database):
+        report = await db.run(build_report, data)
+
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+            path = tmp.name
+        try:
+            # utf-8-sig, чтобы Excel правильно открывал кириллицу
+            with open(path, "w", encoding="utf-8-sig", newline="") as output:
+                report.write_csv(output)
+
+            await job.progress("отправка файла")
+            await job.bot.send_document(
+                chat_id=chat_id,
+                document=FSInputFile(path, filename=f"report_{data['report']}.csv"),
+                caption=f"Отчёт: {REPORTS[data['report']][0]}"
+            )
+        finally:
+            os.remove(path)
+
+    await callback.answer()
+    await job_runner.submit(callback.from_user.id, chat_id, "Отчёт", run_export)
+
+
+def reports_dialog():
+    return Dialog(
+        Window(
+            Format(
+                "Отчёты по учёту времени\n\n"
+                "Период: {period}\n"
+                "Разбивка: {step}\n\n"
+                "Выберите отчёт:"
+            ),
+            Select(
+                text=Format("{item[1]}"),
+                items="reports",
+                id="report_select",
+                item_id_getter=lambda x: x[0],
+                on_click=on_report_selected,
+            ),
+            Row(
+                Button(Const("📅 Период"), id="period", on_click=lambda c, b, m: m.switch_to(ReportState.period)),
+                Button(Const("🗓 Разбивка"), id="step", on_click=on_step_clicked),
+            ),
+            Cancel(Const("❌ Отмена")),
+            state=ReportState.main,
+            getter=main_getter,
+        ),
+        Window(
+            Const("Введите период в формате ДД.ММ.ГГГГ - ДД.ММ.ГГГГ\nНапример: 01.01.2025 - 31.12.2025"),
+            MessageInput(on_period_entered, content_types=["text"]),
+            Button(Const("⬅️ Назад"), id="back_from_period",
+                   on_click=lambda c, b, m: m.switch_to(ReportState.main)),
+            state=ReportState.period,
+        ),
+        Window(
+            Format("{title}\n\n{header}\n{rows}"),
+            Button(Const("📥 Скачать CSV"), id="export_report", on_click=export_report),
+            Button(Const("⬅️ Назад"), id="back_from_result",
+                   on_click=lambda c, b, m: m.switch_to(ReportState.main)),
+            state=ReportState.result,
+            getter=result_getter,
+            parse_mode=None,
+        ),
+    )
@@ -1,4 +1,7 @@
-from typing import Any
+import asyncio
+from typing import Any, Dict, List, Set
+
+from aiogram.exceptions import AiogramError
 from aiogram.fsm.state import StatesGroup, State
 from aiogram_dialog import DialogManager, Window, Dialog
 from aiogram_dialog.widgets.kbd import Button, Row, Back, Cancel
@@ -7,8 +10,11 @@ from aiogram_dialog.widgets.input import MessageInput
 from aiogram.types import Message, CallbackQuery
 
 from data.worker_operations import WorkerOperations
+from message_sender import MessageSender
 from widgets.Vertical import Multiselect
 
+_broadcast_tasks: Set[asyncio.Task] = set()
+
 
 class SendMessageState(StatesGroup):
     select_workers = State()
@@ -18,7 +24,7 @@ class SendMessageState(StatesGroup):
 
 async def workers_getter(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data["db"]
-    workers = WorkerOperations.get_all_workers(db)
+    workers = await db.run(WorkerOperations.get_all_workers)
 
     return {
         "workers": workers,
@@ -30,7 +36,7 @@ async def message_getter(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data["db"]
     data = dialog_manager.current_context().dialog_data
     selected_workers = data.get("selected_workers", [])
-    workers = WorkerOperations.get_all_workers(db)
+    workers = await db.run(WorkerOperations.get_all_workers)
     message_text = data.get("message_text", "Не указано")
 
     selected_workers_names = [
@@ -70,15 +76,57 @@ async def confirm_send(callback: CallbackQuery, widget: Any, dialog_manager: Dia
         await callback.answer("Ошибка: сервис отправки сообщений не доступен")
         return
 
-    success_count = 0
-    for worker_id in selected_workers:
-        if await message_sender.send_message(user_id=int(worker_id), message=message_text):
-            success_count += 1
+    db = dialog_manager.middleware_data["db"]
+    workers = await db.run(WorkerOperations.get_all_workers)
+    names = {worker["telegram_id"]: worker["name"] for worker in workers}
+    recipients = [int(worker_id) for worker_id in selected_workers]
+
+    await callback.answer("Рассылка запущена")
+    progress_message = await callback.message.answer(f"Отправка сообщения: 0/{len(recipients)}")
+
+    # Рассылка идёт в фоне, чтобы не держать callback до последней отправки
+    task = asyncio.create_task(_broadcast(message_sender, progress_message, recipients, names, message_text))
+    _broadcast_tasks.add(task)
+    task.add_done_callback(_broadcast_tasks.discard)
 
-    await callback.answer(f"Сообщение отправлено {success_count}/{len(selected_workers)} работникам")
     await dialog_manager.done()
 
 
+async def _broadcast(message_sender: MessageSender, progress_message: Message,
+                     recipients: List[int], names: Dict[int, str], message_text: str):
+    async def on_progress(done: int, total: int):
+        await _edit_progress(progress_message, f"Отправка сообщения: {done}/{total}")
+
+    try:
+        results = await message_sender.broadcast(recipients, message_text, on_progress=on_progress)
+    except Exception as e:
+        print(f"Broadcast failed: {e}")
+        await _edit_progress(progress_message, "Ошибка при отправке сообщения")
+        return
+
+    sent = [names.get(user_id, str(user_id)) for user_id, ok in results.items() if ok]
+    failed = [names.get(user_id, str(user_id)) for user_id, ok in results.items() if not ok]
+
+    report = f"Сообщение отправлено {len(sent)}/{len(recipients)} работникам"
+    if sent:
+        report += "\n\n✅ Доставлено:\n" + "\n".join(sent)
+    if failed:
+        report += "\n\n❌ Не доставлено:\n" + "\n".join(failed)
+    if len(report) > 4096:
+        report = report[:4093] + "..."
+
+    await _edit_progress(progress_message, report)
+
+
+async def _edit_progress(progress_message: Message, text: str):
+    # Отчёт — простой текст с именами работников, поэтому без разметки:
+    # символы < и & в именах и обрезка по 4096 не ломают сообщение
+    try:
+        await progress_message.edit_text(text, parse_mode=None)
+    except AiogramError as e:
+        print(f"Failed to update broadcast message: {e}")
+
+
 def send_message_dialog():
     return Dialog(
         Window(
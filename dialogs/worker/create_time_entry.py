@@ -24,17 +24,16 @@ class TimeEntryStates(StatesGroup):
 
 async def get_active_projects(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data['db']
-    telegram_id = dialog_manager.event.from_user.id
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
 
-    active_projects = WorkerOperations.get_worker_active_projects_full(db, worker['id'])
+    active_projects = await db.run(WorkerOperations.get_worker_active_projects_full, worker['id'])
 
     if worker.get('can_receive_custom_tasks', False):
-        custom_project = ProjectOperations.get_custom_project(db)
+        custom_project = await db.run(ProjectOperations.get_custom_project)
         active_projects.insert(0, custom_project)
 
     if worker.get('can_receive_nonproject_tasks', False):
-        nonproject_project = ProjectOperations.get_nonproject_project(db)
+        nonproject_project = await db.run(ProjectOperations.get_nonproject_project)
         active_projects.insert(0, nonproject_project)
 
     return {
@@ -46,11 +45,11 @@ async def get_project_tasks(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data['db']
     project_id = dialog_manager.dialog_data.get("project_id")
 
-    project_tasks = ProjectOperations.get_tasks_for_project(db, project_id)
+    project_tasks = await db.run(ProjectOperations.get_tasks_for_project, project_id)
 
     return {
         "project_tasks": project_tasks,
-        "project_name": ProjectOperations.get_project_name(db, project_id)
+        "project_name": await db.run(ProjectOperations.get_project_name, project_id)
     }
 
 
@@ -93,7 +92,7 @@ async def comment_entered(message: Message, widget: TextInput,
 async def get_confirmation_data(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data['db']
     project_task_id = dialog_manager.dialog_data.get("project_task_id")
-    project_task_info = TaskOperations.get_project_task_info(db, project_task_id)
+    project_task_info = await db.run(TaskOperations.get_project_task_info, project_task_id)
     entry_date = datetime.strptime(dialog_manager.dialog_data["entry_date"], "%Y-%m-%d").date()
 
     return {
@@ -111,8 +110,7 @@ async def save_time_entry(callback: CallbackQuery, button: Button,
                           dialog_manager: DialogManager):
     db = dialog_manager.middleware_data['db']
     notification_sender = dialog_manager.middleware_data['notification_sender']
-    telegram_id = dialog_manager.event.from_user.id
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
 
     time_entry_data = {
         "project_task_id": dialog_manager.dialog_data["project_task_id"],
@@ -123,8 +121,8 @@ async def save_time_entry(callback: CallbackQuery, button: Button,
     }
 
     try:
-        TimeEntryOperations.add_time_entry(db, time_entry_data)
-        await notification_sender.on_data_changed(worker['id'])
+        await db.run(TimeEntryOperations.add_time_entry, time_entry_data)
+        notification_sender.on_data_changed(worker['id'])
 
         await callback.message.answer("Время успешно сохранено!")
     except Exception as e:
@@ -27,10 +27,7 @@ async def get_days_of_week(dialog_manager: DialogManager, **kwargs):
         {"value": "воскресенье", "label": "Воскресенье"},
     ]
 
-    db = dialog_manager.middleware_data['db']
-    telegram_id = dialog_manager.event.from_user.id
-
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
     current_day = worker.get('reminder_day', 'пятница')
 
     return {
@@ -46,10 +43,7 @@ async def on_day_selected(callback: CallbackQuery, widget: Select,
 
 
 async def get_time_input(dialog_manager: DialogManager, **kwargs):
-    db = dialog_manager.middleware_data['db']
-    telegram_id = dialog_manager.event.from_user.id
-
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
     current_time = worker.get('reminder_time', time(17, 0)).strftime("%H:%M")
 
     return {
@@ -82,21 +76,20 @@ async def on_confirmation(callback: CallbackQuery, button: Button, dialog_manage
     db = dialog_manager.middleware_data['db']
     notification_sender = dialog_manager.middleware_data['notification_sender']
 
-    telegram_id = dialog_manager.event.from_user.id
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
 
     selected_day = dialog_manager.dialog_data['selected_day']
     selected_time = dialog_manager.dialog_data['selected_time']
 
     if selected_day and selected_time:
-        WorkerOperations.update_worker_reminder_settings(
-            db,
+        await db.run(
+            WorkerOperations.update_worker_reminder_settings,
             worker['id'],
             day=selected_day,
             time=selected_time
         )
 
-        await notification_sender.on_data_changed(worker['id'])
+        notification_sender.on_settings_changed(worker, selected_day, selected_time)
 
         await callback.message.answer(
             f"Напоминания установлены на {selected_day} в {selected_time}!"
@@ -4,13 +4,14 @@ from aiogram_dialog import Dialog, Window, DialogManager
 from aiogram_dialog.widgets.kbd import Button, Cancel, Row
 from aiogram_dialog.widgets.text import Const, Format
 from aiogram_dialog.widgets.input import TextInput, MessageInput
-import pandas as pd
-from io import BytesIO
-import psycopg2
-from datetime import datetime, date, timedelta
+from datetime import date
 import calendar
 import re
 
+from data.database import Database
+from job_runner import Job
+from spreadsheets import render_time_table
+
 
 class ExportTimeTableStates(StatesGroup):
     select_period = State()
@@ -18,164 +19,74 @@ class ExportTimeTableStates(StatesGroup):
     processing = State()
 
 
-async def get_worker_time_data(worker_telegram_id: int, db_conn, start_date: date, end_date: date) -> pd.DataFrame:
-    all_dates = []
-    current_date = start_date
-    while current_date <= end_date:
-        all_dates.append(current_date)
-        current_date += timedelta(days=1)
-
-    date_columns = [d.strftime('%d.%m.%Y') for d in all_dates]
-
-    with db_conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT DISTINCT p.id, p.name
-            FROM worker_active_project wap
-            JOIN project p ON wap.project_id = p.id
-            JOIN worker w ON wap.worker_id = w.id
-            WHERE w.telegram_id = %s
-            ORDER BY p.name
-        """, (worker_telegram_id,))
-        all_projects = cursor.fetchall()
-
+def get_worker_time_data(db: Database, worker_telegram_id: int, start_date: date, end_date: date):
+    """Возвращает проекты [(id, name)] и строки задач табеля простыми кортежами"""
+    # Проекты работника — активные и те, где есть его записи за период;
+    # по каждому все задачи и часы работника по датам одним запросом
+    with db.conn.cursor() as cursor:
         cursor.execute("""
-            SELECT DISTINCT 
-                p.id AS project_id,
-                p.name AS project_name
-            FROM time_entry te
-            JOIN worker w ON te.worker_id = w.id
-            JOIN project_task pt ON te.project_task_id = pt.id
-            JOIN project p ON pt.project_id = p.id
-            WHERE w.telegram_id = %s
-            AND te.entry_date BETWEEN %s AND %s
-        """, (worker_telegram_id, start_date, end_date))
-        projects_with_entries = cursor.fetchall()
-
-        unique_projects = {p[0]: p[1] for p in all_projects}
-        for p in projects_with_entries:
-            unique_projects.setdefault(p[0], p[1])
-
-        result_rows = []
-
-        for project_id, project_name in unique_projects.items():
-            result_rows.append({
-                'Тип': 'Проект',
-                'project_task_id': '',
-                'Проект': project_name,
-                'Шрифт': '',
-                'Задача': '',
-                **{d.strftime('%d.%m.%Y'): '' for d in all_dates}
-            })
-
-            cursor.execute("""
-                SELECT 
-                    pt.id, t.name, f.name, te.entry_date, te.hours
-                FROM project_task pt
+            WITH w AS (
+                SELECT id FROM worker WHERE telegram_id = %(telegram_id)s
+            ), worker_projects AS (
+                SELECT wap.project_id
+                FROM worker_active_project wap
+                JOIN w ON wap.worker_id = w.id
+                UNION
+                SELECT pt.project_id
+                FROM time_entry te
+                JOIN w ON te.worker_id = w.id
+                JOIN project_task pt ON te.project_task_id = pt.id
+                WHERE te.entry_date BETWEEN %(start_date)s AND %(end_date)s
+            )
+            SELECT p.id, p.name, pt.id, t.name, f.name, te.entry_date, te.hours
+            FROM worker_projects wp
+            JOIN project p ON p.id = wp.project_id
+            CROSS JOIN w
+            LEFT JOIN (
+                project_task pt
                 JOIN task t ON pt.task_id = t.id
-                LEFT JOIN font f ON pt.font_id = f.id
-                LEFT JOIN time_entry te ON te.project_task_id = pt.id 
-                    AND te.worker_id = (SELECT id FROM worker WHERE telegram_id = %s)
-                    AND te.entry_date BETWEEN %s AND %s
-                WHERE pt.project_id = %s
-                ORDER BY t.name, te.entry_date
-            """, (worker_telegram_id, start_date, end_date, project_id))
-
-            tasks_data = cursor.fetchall()
-
-            tasks_by_id = {}
-            for pt_id, task_name, font_name, entry_date, hours in tasks_data:
-                tasks_by_id.setdefault(pt_id, {
-                    'task_name': task_name,
-                    'font_name': font_name or '',
-                    'entries': {}
-                })
-                if entry_date:
-                    date_str = entry_date.strftime('%d.%m.%Y')
-                    tasks_by_id[pt_id]['entries'][date_str] = hours
-
-            for pt_id, data in tasks_by_id.items():
-                result_rows.append({
-                    'Тип': 'Задача',
-                    'project_task_id': pt_id,
-                    'Проект': project_name,
-                    'Шрифт': data['font_name'],
-                    'Задача': data['task_name'],
-                    **{d.strftime('%d.%m.%Y'): data['entries'].get(d.strftime('%d.%m.%Y'), '') for d in all_dates}
-                })
-
-    column_order = ['Тип', 'project_task_id', 'Проект', 'Шрифт', 'Задача'] + date_columns
-    df = pd.DataFrame(result_rows)
-    for col in column_order:
-        if col not in df.columns:
-            df[col] = ''
-
-    return df[column_order]
-
-
-async def export_to_excel(df: pd.DataFrame, filename: str) -> BytesIO:
-    output = BytesIO()
-
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Табель')
-        workbook = writer.book
-        worksheet = writer.sheets['Табель']
-
-        header_format = workbook.add_format({
-            'bold': True, 'text_wrap': True, 'valign': 'top',
-            'fg_color': '#D7E4BC', 'border': 1, 'align': 'center',
-            'rotation': 90
-        })
-        project_format = workbook.add_format({'bold': True, 'fg_color': '#B7DEE8', 'border': 1})
-        task_format = workbook.add_format({'border': 1})
-        hour_format = workbook.add_format({'num_format': '0.00', 'border': 1, 'align': 'center'})
-
-        for col_num, col in enumerate(df.columns):
-            worksheet.write(0, col_num, col, header_format)
-            worksheet.set_column(col_num, col_num,
-                                 12 if col == 'project_task_id' else 18 if col in ['Проект', 'Шрифт', 'Задача'] else 8)
-
-        for row_idx in range(len(df)):
-            row = df.iloc[row_idx]
-            row_type = row['Тип']
-
-            if row_type == 'Проект':
-                fmt = project_format
-            else:
-                fmt = task_format
-
-            for col_idx, value in enumerate(row):
-                if row_type == 'Задача' and df.columns[col_idx] not in ['Тип', 'project_task_id', 'Проект', 'Шрифт',
-                                                                        'Задача'] and value != '':
-                    worksheet.write(row_idx + 1, col_idx, float(value), hour_format)
-                else:
-                    worksheet.write(row_idx + 1, col_idx, value, fmt)
-
-    output.seek(0)
-    return output
+            ) ON pt.project_id = p.id
+            LEFT JOIN font f ON pt.font_id = f.id
+            LEFT JOIN time_entry te ON te.project_task_id = pt.id
+                AND te.worker_id = w.id
+                AND te.entry_date BETWEEN %(start_date)s AND %(end_date)s
+            ORDER BY p.name, p.id, t.name, te.entry_date
+        """, dict(telegram_id=worker_telegram_id, start_date=start_date, end_date=end_date))
+        rows = cursor.fetchall()
+
+    projects = list(dict((row[0], row[1]) for row in rows).items())
+    records = [(project_id, pt_id, task_name, font_name, entry_date, hours)
+               for project_id, _, pt_id, task_name, font_name, entry_date, hours in rows
+               if pt_id is not None]
+
+    return projects, records
 
 
 async def process_export_with_dates(message: Message, dialog_manager: DialogManager,
                                     start_date: date, end_date: date):
-    try:
-        db = dialog_manager.middleware_data['db']
-        telegram_id = dialog_manager.event.from_user.id
+    job_runner = dialog_manager.middleware_data['job_runner']
+    telegram_id = dialog_manager.event.from_user.id
 
-        df = await get_worker_time_data(telegram_id, db.conn, start_date, end_date)
-        print("Сформированный DataFrame:\n", df.head())
+    async def export(job: Job, db: Database):
+        projects, records = await db.run(get_worker_time_data, telegram_id, start_date, end_date)
 
-        today = datetime.now().strftime("%Y-%m-%d")
+        await job.progress("формирование файла")
         period_str = f"{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}"
         filename = f"Табель_{telegram_id}_{period_str}.xlsx"
-        excel_file = await export_to_excel(df, filename)
+        content = await job.run_cpu(render_time_table, projects, records, start_date, end_date)
 
-        await message.answer_document(
+        await job.progress("отправка файла")
+        await job.bot.send_document(
+            chat_id=message.chat.id,
             document=BufferedInputFile(
-                file=excel_file.getvalue(),
+                file=content,
                 filename=filename
             ),
             caption=f"Табель времени сотрудника за период {start_date.strftime('%d.%m.%Y')}-{end_date.strftime('%d.%m.%Y')}"
         )
 
+    try:
+        await job_runner.submit(telegram_id, message.chat.id, "Экспорт табеля", export)
     except Exception as e:
         await message.answer(f"Ошибка: {str(e)}")
     finally:
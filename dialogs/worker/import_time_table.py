@@ -1,5 +1,4 @@
-from datetime import datetime
-from io import BytesIO
+from io import BytesIO, StringIO
 
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import Document, BufferedInputFile, CallbackQuery, Message
@@ -9,9 +8,14 @@ import pandas as pd
 from aiogram_dialog.widgets.text import Const, Format
 from aiogram_dialog.widgets.input import MessageInput
 
+from data.database import Database
+from job_runner import Job
+from spreadsheets import parse_time_table
+
 
 class ImportTimeTableStates(StatesGroup):
     upload = State()
+    processing = State()
     confirm = State()
 
 
@@ -21,63 +25,167 @@ async def on_file_uploaded(message: Message, message_input: MessageInput, dialog
         await message.answer("⚠️ Пожалуйста, загрузите .xlsx файл")
         return
 
+    job_runner = dialog_manager.middleware_data["job_runner"]
+    telegram_id = dialog_manager.event.from_user.id
     file_id = document.file_id
-    file = await dialog_manager.event.bot.get_file(file_id)
-    file_path = file.file_path
+    bg = dialog_manager.bg()
 
-    file_bytes = BytesIO()
-    await dialog_manager.event.bot.download_file(file_path, file_bytes)
-    file_bytes.seek(0)
+    async def parse(job: Job, db: Database):
+        file = await job.bot.get_file(file_id)
+        file_bytes = BytesIO()
+        await job.bot.download_file(file.file_path, file_bytes)
 
-    df = pd.read_excel(file_bytes, sheet_name="Табель")
-    df = df[df["Тип"] == "Задача"]
+        await job.progress("чтение файла")
+        sheet = await job.run_cpu(parse_time_table, file_bytes.getvalue())
 
-    dialog_manager.dialog_data["xlsx_df"] = df
-    await dialog_manager.switch_to(ImportTimeTableStates.confirm)
+        await job.progress("сравнение с базой")
+        diffs = await db.run(compute_diffs, telegram_id, *sheet)
 
+        await bg.update({"diffs": diffs})
+        await bg.switch_to(ImportTimeTableStates.confirm)
+
+    job = await job_runner.submit(telegram_id, message.chat.id, "Импорт табеля", parse)
+    if job is None:
+        return
+
+    dialog_manager.dialog_data["job_id"] = job.id
+    await dialog_manager.switch_to(ImportTimeTableStates.processing)
 
-async def get_diffs(dialog_manager: DialogManager, **kwargs):
-    db = dialog_manager.middleware_data["db"]
-    telegram_id = dialog_manager.event.from_user.id
-    df = dialog_manager.dialog_data.get("xlsx_df")
 
+async def cancel_processing(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
+    job_runner = dialog_manager.middleware_data["job_runner"]
+    job_id = dialog_manager.dialog_data.get("job_id")
+    if job_id is not None:
+        await job_runner.cancel(job_id, callback.from_user.id)
+    await dialog_manager.done()
+
+
+ADD, CHANGE, DELETE = "🆕 добавить", "✏️ изменить", "❌ удалить"
+
+
+def compute_diffs(db: Database, telegram_id: int, entries: list, task_ids: list, start_date, end_date):
     with db.conn.cursor() as cursor:
         cursor.execute("SELECT id FROM worker WHERE telegram_id = %s", (telegram_id,))
         row = cursor.fetchone()
         if not row:
-            return {"preview": "Пользователь не найден в базе."}
+            return None
         worker_id = row[0]
 
+        if start_date is None or not task_ids:
+            return []
+
+        # Сравниваются только записи задач из табеля в его диапазоне дат
         cursor.execute("""
             SELECT project_task_id, entry_date, hours
             FROM time_entry
             WHERE worker_id = %s
-        """, (worker_id,))
-        db_entries = cursor.fetchall()
-        db_map = {(r[0], r[1]): r[2] for r in db_entries}
+              AND entry_date BETWEEN %s AND %s
+              AND project_task_id = ANY(%s)
+        """, (worker_id, start_date, end_date, task_ids))
+        db_entries = pd.DataFrame(cursor.fetchall(), columns=["project_task_id", "entry_date", "hours"]).astype(
+            {"project_task_id": int, "hours": float}
+        )
+
+    sheet_entries = pd.DataFrame(entries, columns=["project_task_id", "entry_date", "hours"]).astype(
+        {"project_task_id": int, "hours": float}
+    )
+    merged = sheet_entries.merge(
+        db_entries, on=["project_task_id", "entry_date"], how="outer",
+        suffixes=("_new", "_old"), indicator=True
+    )
 
-        file_map = {}
-        diffs = []
+    added = merged[merged["_merge"] == "left_only"]
+    changed = merged[(merged["_merge"] == "both")
+                     & (merged["hours_old"].round(2) != merged["hours_new"].round(2))]
+    deleted = merged[merged["_merge"] == "right_only"]
+
+    diffs = []
+    for action, rows in ((ADD, added), (CHANGE, changed), (DELETE, deleted)):
+        diffs.extend(
+            (action, int(task_id), entry_date,
+             None if pd.isna(old) else float(old),
+             None if pd.isna(new) else float(new))
+            for task_id, entry_date, old, new in zip(
+                rows["project_task_id"], rows["entry_date"], rows["hours_old"], rows["hours_new"]
+            )
+        )
+    return diffs
 
-        for _, row in df.iterrows():
-            task_id = int(row["project_task_id"])
-            for col in df.columns[5:]:
-                if pd.isna(row[col]) or row[col] == '':
-                    continue
-                entry_date = datetime.strptime(col, "%d.%m.%Y").date()
-                hours = float(row[col])
-                file_map[(task_id, entry_date)] = hours
 
-                if (task_id, entry_date) not in db_map:
-                    diffs.append(("🆕 добавить", task_id, entry_date, None, hours))
-                elif round(db_map[(task_id, entry_date)], 2) != round(hours, 2):
-                    diffs.append(("✏️ изменить", task_id, entry_date, db_map[(task_id, entry_date)], hours))
+def apply_diffs(db: Database, telegram_id: int, diffs: list) -> dict:
+    """Применяет изменения одной транзакцией через временную таблицу"""
+    with db.conn.cursor() as cursor:
+        try:
+            cursor.execute("SELECT id FROM worker WHERE telegram_id = %s", (telegram_id,))
+            worker_id = cursor.fetchone()[0]
+
+            cursor.execute("""
+                CREATE TEMP TABLE import_staging (
+                    project_task_id INTEGER NOT NULL,
+                    entry_date DATE NOT NULL,
+                    hours DOUBLE PRECISION
+                ) ON COMMIT DROP
+            """)
+
+            staging = StringIO()
+            for action, task_id, entry_date, old, new in diffs:
+                hours = "\\N" if action == DELETE else repr(new)
+                staging.write(f"{task_id}\t{entry_date.isoformat()}\t{hours}\n")
+            staging.seek(0)
+            cursor.copy_expert("COPY import_staging FROM STDIN", staging)
+
+            cursor.execute("""
+                DELETE FROM time_entry te
+                USING import_staging s
+                WHERE te.worker_id = %s
+                  AND te.project_task_id = s.project_task_id
+                  AND te.entry_date = s.entry_date
+                  AND s.hours IS NULL
+            """, (worker_id,))
+            deleted = cursor.rowcount
+
+            # Изменённые и добавленные записи считаются по rowcount двух запросов:
+            # RETURNING xmax недоступен, когда time_entry секционирована
+            cursor.execute("""
+                UPDATE time_entry te
+                SET hours = s.hours
+                FROM import_staging s
+                WHERE te.worker_id = %s
+                  AND te.project_task_id = s.project_task_id
+                  AND te.entry_date = s.entry_date
+                  AND s.hours IS NOT NULL
+            """, (worker_id,))
+            changed = cursor.rowcount
+
+            # ON CONFLICT — на случай записи, добавленной параллельно после UPDATE
+            cursor.execute("""
+                INSERT INTO time_entry (worker_id, project_task_id, entry_date, hours)
+                SELECT %s, s.project_task_id, s.entry_date, s.hours
+                FROM import_staging s
+                WHERE s.hours IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM time_entry te
+                      WHERE te.worker_id = %s
+                        AND te.project_task_id = s.project_task_id
+                        AND te.entry_date = s.entry_date
+                  )
+                ON CONFLICT (worker_id, project_task_id, entry_date) DO UPDATE
+                SET hours = EXCLUDED.hours
+            """, (worker_id, worker_id))
+            added = cursor.rowcount
+
+            db.conn.commit()
+        except Exception:
+            db.conn.rollback()
+            raise
+
+    return {"added": added, "changed": changed, "deleted": deleted}
 
-        for key, old_hours in db_map.items():
-            if key[0] in df["project_task_id"].values and key not in file_map:
-                diffs.append(("❌ удалить", key[0], key[1], old_hours, None))
 
-    dialog_manager.dialog_data["diffs"] = diffs
+async def get_diffs(dialog_manager: DialogManager, **kwargs):
+    diffs = dialog_manager.dialog_data.get("diffs")
+    if diffs is None:
+        return {"preview": "Пользователь не найден в базе."}
 
     preview = "\n".join(
         f"{mark} task_id={task_id}, {entry_date}: {old or ''} → {new or ''}"
@@ -88,33 +196,21 @@ async def get_diffs(dialog_manager: DialogManager, **kwargs):
     return {"preview": preview or "Нет изменений"}
 
 async def apply_diff(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
-    db = dialog_manager.middleware_data["db"]
+    job_runner = dialog_manager.middleware_data["job_runner"]
     telegram_id = dialog_manager.event.from_user.id
-    diffs = dialog_manager.dialog_data["diffs"]
-
-    with db.conn.cursor() as cursor:
-        cursor.execute("SELECT id FROM worker WHERE telegram_id = %s", (telegram_id,))
-        worker_id = cursor.fetchone()[0]
-
-        for action, task_id, entry_date, old, new in diffs:
-            if action == "🆕 добавить":
-                cursor.execute("""
-                    INSERT INTO time_entry (worker_id, project_task_id, entry_date, hours)
-                    VALUES (%s, %s, %s, %s)
-                """, (worker_id, task_id, entry_date, new))
-            elif action == "✏️ изменить":
-                cursor.execute("""
-                    UPDATE time_entry SET hours = %s
-                    WHERE worker_id = %s AND project_task_id = %s AND entry_date = %s
-                """, (new, worker_id, task_id, entry_date))
-            elif action == "❌ удалить":
-                cursor.execute("""
-                    DELETE FROM time_entry
-                    WHERE worker_id = %s AND project_task_id = %s AND entry_date = %s
-                """, (worker_id, task_id, entry_date))
-
-    db.conn.commit()
-    await callback.message.answer(f"✅ Изменения применены: {len(diffs)} операций")
+    chat_id = callback.message.chat.id
+    diffs = dialog_manager.dialog_data.get("diffs")
+
+    if diffs:
+        async def apply(job: Job, db: Database):
+            summary = await db.run(apply_diffs, telegram_id, diffs)
+            await job.bot.send_message(
+                chat_id,
+                f"✅ Изменения применены: добавлено {summary['added']}, "
+                f"изменено {summary['changed']}, удалено {summary['deleted']}"
+            )
+
+        await job_runner.submit(telegram_id, chat_id, "Применение изменений табеля", apply)
     await dialog_manager.done()
 
 def import_time_table_dialog():
@@ -125,6 +221,11 @@ def import_time_table_dialog():
             Cancel(Const("❌ Отмена")),
             state=ImportTimeTableStates.upload,
         ),
+        Window(
+            Const("⏳ Файл обрабатывается..."),
+            Button(Const("❌ Отмена"), id="cancel_processing", on_click=cancel_processing),
+            state=ImportTimeTableStates.processing,
+        ),
         Window(
             Format("🔍 Найдены изменения:\n\n{preview}"),
             Button(Const("✅ Применить изменения"), id="apply", on_click=apply_diff),
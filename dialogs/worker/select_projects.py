@@ -15,11 +15,10 @@ class ProjectSelectStates(StatesGroup):
 
 async def get_projects(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data['db']
-    telegram_id = dialog_manager.event.from_user.id
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
 
-    available_projects = ProjectOperations.get_available_projects(db, worker['id'])
-    active_projects = WorkerOperations.get_worker_active_projects(db, worker['id'])
+    available_projects = await db.run(ProjectOperations.get_available_projects)
+    active_projects = await db.run(WorkerOperations.get_worker_active_projects, worker['id'])
 
     return {
         "available_projects": available_projects,
@@ -29,11 +28,10 @@ async def get_projects(dialog_manager: DialogManager, **kwargs):
 
 async def on_dialog_start(start_data: dict, dialog_manager: DialogManager):
     db = dialog_manager.middleware_data['db']
-    telegram_id = dialog_manager.event.from_user.id
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
 
 
-    active_project_ids = WorkerOperations.get_worker_active_projects(db, worker['id'])
+    active_project_ids = await db.run(WorkerOperations.get_worker_active_projects, worker['id'])
     widget = dialog_manager.find("m_projects")
     for active_project_id in active_project_ids:
         await widget.set_checked(active_project_id, True)
@@ -45,11 +43,10 @@ async def on_project_selected(callback: CallbackQuery, button: Button, dialog_ma
 
 async def on_confirmation(callback: CallbackQuery, button: Button, dialog_manager: DialogManager):
     db = dialog_manager.middleware_data['db']
-    telegram_id = dialog_manager.event.from_user.id
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
     selected_projects = dialog_manager.find("m_projects").get_checked()
 
-    WorkerOperations.set_worker_active_projects(db, worker['id'], selected_projects)
+    await db.run(WorkerOperations.set_worker_active_projects, worker['id'], selected_projects)
     await callback.message.answer("Проекты успешно добавлены!")
 
     await dialog_manager.done()
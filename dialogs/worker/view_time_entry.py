@@ -6,12 +6,10 @@ from aiogram_dialog.widgets.text import Const, Format
 from aiogram_dialog.widgets.input import TextInput
 from datetime import datetime, timedelta, date
 
-from data.font_operations import FontOperations
-from data.project_operations import ProjectOperations
-from data.task_operations import TaskOperations
 from data.time_entry_operations import TimeEntryOperations
-from data.worker_operations import WorkerOperations
-from widgets.Vertical import Select
+from widgets.Vertical import Select, PaginatedSelect
+
+ENTRIES_PAGE_SIZE = 10
 
 
 class ViewTimeEntriesStates(StatesGroup):
@@ -34,29 +32,36 @@ async def get_time_periods(dialog_manager: DialogManager, **kwargs):
 
 async def get_time_entries(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data['db']
-    telegram_id = dialog_manager.event.from_user.id
-    worker = WorkerOperations.get_worker_by_telegram_id(db, telegram_id)
+    worker = dialog_manager.middleware_data['worker']
     period = dialog_manager.dialog_data.get("period")
 
-    today = datetime.today()
+    today = date.today()
 
     if period == "today":
-        start_date = today - timedelta(days=1)
-        entries = TimeEntryOperations.get_time_entries(db, worker['id'], start_date=start_date)
+        start_date = today
     elif period == "week":
         start_date = today - timedelta(days=today.weekday())
-        entries = TimeEntryOperations.get_time_entries(db, worker['id'], start_date=start_date)
     elif period == "month":
-        start_date = datetime(today.year, today.month, 1)
-        entries = TimeEntryOperations.get_time_entries(db, worker['id'], start_date=start_date)
+        start_date = today.replace(day=1)
     else:
-        entries = TimeEntryOperations.get_time_entries(db, worker['id'])
+        start_date = None
+
+    before = None
+    cursor = dialog_manager.find("s_entries").get_cursor()
+    if cursor:
+        cursor_date, cursor_id = cursor.split("_")
+        before = (date.fromisoformat(cursor_date), int(cursor_id))
+
+    entries = await db.run(TimeEntryOperations.get_time_entries_detailed, worker['id'],
+                           start_date=start_date, before=before, limit=ENTRIES_PAGE_SIZE + 1)
+    has_next = len(entries) > ENTRIES_PAGE_SIZE
+    entries = entries[:ENTRIES_PAGE_SIZE]
 
     formatted_entries = []
     for entry in entries:
-        project_name = ProjectOperations.get_project_name(db, entry['project_id'])
-        task_name = TaskOperations.get_task_name(db, entry['task_id'])
-        font_name = FontOperations.get_font_name(db, entry['font_id'])
+        project_name = entry['project_name']
+        task_name = entry['task_name']
+        font_name = entry['font_name'] or ""
 
         entry_date = entry['entry_date']
         if isinstance(entry_date, str):
@@ -66,11 +71,13 @@ async def get_time_entries(dialog_manager: DialogManager, **kwargs):
         formatted_entries.append({
             "id": entry['id'],
             "text": f"{date_str} | {project_name} - {task_name} ({font_name}): {entry['hours']}ч",
-            "hours": entry['hours']
+            "hours": entry['hours'],
+            "cursor": f"{entry_date.isoformat()}_{entry['id']}",
         })
 
     return {
         "entries": formatted_entries,
+        "has_next": has_next,
         "period": period
     }
 
@@ -79,10 +86,10 @@ async def get_entry_details(dialog_manager: DialogManager, **kwargs):
     db = dialog_manager.middleware_data['db']
     entry_id = dialog_manager.dialog_data["entry_id"]
 
-    entry = TimeEntryOperations.get_time_entry(db, entry_id)
-    project_name = ProjectOperations.get_project_name(db, entry['project_id'])
-    task_name = TaskOperations.get_task_name(db, entry['task_id'])
-    font_name = FontOperations.get_font_name(db, entry['font_id'])
+    entry = await db.run(TimeEntryOperations.get_time_entry_detailed, entry_id)
+    project_name = entry['project_name']
+    task_name = entry['task_name']
+    font_name = entry['font_name'] or ""
 
     entry_date = entry['entry_date']
     if isinstance(entry_date, str):
@@ -99,6 +106,7 @@ async def get_entry_details(dialog_manager: DialogManager, **kwargs):
 async def period_selected(callback: CallbackQuery, widget: Select,
                           dialog_manager: DialogManager, item_id: str):
     dialog_manager.dialog_data["period"] = item_id
+    dialog_manager.find("s_entries").reset()
     await dialog_manager.next()
 
 
@@ -113,7 +121,7 @@ async def delete_entry(callback: CallbackQuery, button: Button,
     db = dialog_manager.middleware_data['db']
     entry_id = dialog_manager.dialog_data["entry_id"]
 
-    TimeEntryOperations.delete_time_entry(db, entry_id)
+    await db.run(TimeEntryOperations.delete_time_entry, entry_id)
     await dialog_manager.back()
 
 
@@ -125,7 +133,7 @@ async def edit_hours_handler(message: Message, widget: TextInput,
 
         db = dialog_manager.middleware_data['db']
         entry_id = dialog_manager.dialog_data["entry_id"]
-        TimeEntryOperations.update_time_entry(db, entry_id, hours)
+        await db.run(TimeEntryOperations.update_time_entry, entry_id, hours)
 
         await message.answer("Время успешно обновлено!")
         await dialog_manager.switch_to(ViewTimeEntriesStates.entry_actions)
@@ -150,11 +158,12 @@ def view_time_entries_dialog():
         ),
         Window(
             Format("Ваши записи за {period}:"),
-            Select(
+            PaginatedSelect(
                 text=Format("{item[text]}"),
                 id="s_entries",
                 item_id_getter=lambda item: item["id"],
                 items="entries",
+                cursor_getter=lambda item: item["cursor"],
                 on_click=entry_selected
             ),
             Back(Const("⬅️ Назад")),
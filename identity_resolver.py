@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Set
+
+from psycopg2.extras import DictCursor
+
+from data.cache import reference_cache
+from data.database import Database
+
+
+class IdentityResolver:
+    """
+    Индекс администраторов и работников по telegram_id в памяти процесса.
+    Роль пользователя определяется без запросов к БД; индекс перечитывается
+    после изменения работников и раз в refresh_interval секунд (администраторы
+    добавляются напрямую в БД).
+    """
+
+    def __init__(self, refresh_interval: float = None):
+        self.refresh_interval = (refresh_interval if refresh_interval is not None
+                                 else float(os.getenv("IDENTITY_REFRESH_INTERVAL", 300)))
+        self.admins: Set[int] = set()
+        self.workers: Dict[int, dict] = {}
+        self.loaded_at = 0.0
+        self.version = 0
+        self.loaded_version = -1
+        self._lock = asyncio.Lock()
+        reference_cache.add_listener("worker", self.mark_stale)
+
+    def mark_stale(self):
+        # Вызывается из потоков БД, поэтому только меняет счётчик
+        self.version += 1
+
+    def is_fresh(self) -> bool:
+        return (self.loaded_version == self.version
+                and time.monotonic() - self.loaded_at < self.refresh_interval)
+
+    async def ensure_fresh(self, db: Database):
+        if self.is_fresh():
+            return
+        async with self._lock:
+            if self.is_fresh():
+                return
+            version = self.version
+            self.admins, self.workers = await db.run(self._load)
+            self.loaded_at = time.monotonic()
+            self.loaded_version = version
+
+    def is_admin(self, telegram_id: int) -> bool:
+        return telegram_id in self.admins
+
+    def get_worker(self, telegram_id: int) -> Optional[dict]:
+        worker = self.workers.get(telegram_id)
+        return dict(worker) if worker else None
+
+    @staticmethod
+    def _load(db: Database):
+        with db.conn.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute("SELECT telegram_id FROM admin")
+            admins = {row[0] for row in cursor.fetchall()}
+
+            cursor.execute("SELECT * FROM worker WHERE telegram_id IS NOT NULL")
+            workers = {row["telegram_id"]: dict(row) for row in cursor.fetchall()}
+        return admins, workers
@@ -0,0 +1,186 @@
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import AiogramError
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from cpu_executor import cpu_executor
+from data.database import Database, DatabasePool
+
+CANCEL_PREFIX = "job_cancel:"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    Фоновая задача пользователя. Функция задачи получает Job и соединение с БД
+    и сообщает о ходе работы через progress(); отмена проверяется там же.
+    """
+
+    def __init__(self, runner: "JobRunner", job_id: int, user_id: int, chat_id: int, title: str,
+                 func: Callable[["Job", Database], Awaitable[None]]):
+        self.runner = runner
+        self.id = job_id
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.title = title
+        self.func = func
+        self.message_id: Optional[int] = None
+        self.db: Optional[Database] = None
+        self.cancelled = False
+        # Соединение возвращается в пул только под этой блокировкой, поэтому
+        # cancel_query не прервёт запрос чужого обработчика
+        self._db_lock = threading.Lock()
+
+    @property
+    def bot(self) -> Bot:
+        return self.runner.bot
+
+    async def progress(self, text: str):
+        """Обновляет сообщение о ходе задачи. Если задачу отменили, прерывает её."""
+        self.raise_if_cancelled()
+        await self.runner.edit_status(self, f"⏳ {self.title}: {text}", cancellable=True)
+
+    async def run_cpu(self, func, *args):
+        """Выполняет тяжёлую функцию (pandas, xlsx) в пуле процессов."""
+        self.raise_if_cancelled()
+        result = await self.runner.run_cpu(func, *args)
+        self.raise_if_cancelled()
+        return result
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def cancel_query(self):
+        """Прерывает текущий запрос, если задача ещё держит соединение. Блокирующий вызов."""
+        with self._db_lock:
+            if self.db is not None:
+                self.db.conn.cancel()
+
+    def release_db(self):
+        with self._db_lock:
+            self.db = None
+
+
+class JobRunner:
+    """
+    Очередь фоновых задач (выгрузки, импорт). Одновременно выполняется не
+    больше max_concurrency задач, чтобы тяжёлые выгрузки не занимали все
+    соединения и потоки, нужные обычным обработчикам. CPU-работа задач
+    выполняется в cpu_executor.
+    """
+
+    def __init__(self, bot: Bot, pool: DatabasePool, max_concurrency: int = None, max_queue_size: int = None):
+        self.bot = bot
+        self.pool = pool
+        self.max_concurrency = max_concurrency or int(os.getenv("JOB_MAX_CONCURRENCY", 2))
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size or int(os.getenv("JOB_QUEUE_SIZE", 100)))
+        self.jobs: Dict[int, Job] = {}
+        self.workers: List[asyncio.Task] = []
+        self._ids = itertools.count(1)
+
+    async def start(self):
+        for _ in range(self.max_concurrency):
+            self.workers.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def submit(self, user_id: int, chat_id: int, title: str,
+                     func: Callable[[Job, Database], Awaitable[None]]) -> Optional[Job]:
+        """Ставит задачу в очередь и сразу возвращает управление обработчику."""
+        job = Job(self, next(self._ids), user_id, chat_id, title, func)
+
+        if self.queue.full():
+            await self.bot.send_message(chat_id, "Сейчас выполняется слишком много задач, попробуйте позже")
+            return None
+
+        message = await self.bot.send_message(
+            chat_id, f"⏳ {title}: в очереди", reply_markup=self._cancel_keyboard(job), parse_mode=None
+        )
+        job.message_id = message.message_id
+
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await self.edit_status(job, f"⚠️ {title}: очередь задач переполнена, попробуйте позже")
+            return None
+
+        self.jobs[job.id] = job
+        return job
+
+    async def cancel(self, job_id: int, user_id: int) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return False
+
+        job.cancelled = True
+        # Прерывает текущий запрос; функция задачи получит ошибку и завершится
+        await asyncio.get_running_loop().run_in_executor(None, job.cancel_query)
+        await self.edit_status(job, f"❌ {job.title}: отменено")
+        return True
+
+    async def run_cpu(self, func, *args):
+        return await cpu_executor.run(func, *args)
+
+    async def edit_status(self, job: Job, text: str, cancellable: bool = False):
+        if job.message_id is None:
+            return
+        try:
+            await self.bot.edit_message_text(
+                text=text,
+                chat_id=job.chat_id,
+                message_id=job.message_id,
+                reply_markup=self._cancel_keyboard(job) if cancellable else None,
+                parse_mode=None,
+            )
+        except AiogramError as e:
+            logging.warning(f"Failed to update job {job.id} status: {e}")
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if not job.cancelled:
+                    await self._run(job)
+            finally:
+                self.jobs.pop(job.id, None)
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        await self.edit_status(job, f"⏳ {job.title}: выполняется", cancellable=True)
+        try:
+            async with self.pool.acquire() as db:
+                job.db = db
+                try:
+                    await job.func(job, db)
+                finally:
+                    # Ждёт отправленной отмены, если она идёт, до возврата соединения в пул
+                    job.release_db()
+        except Exception as e:
+            if job.cancelled:
+                return
+            logging.exception(f"Job {job.id} ({job.title}) failed")
+            await self.edit_status(job, f"⚠️ {job.title}: ошибка — {e}")
+            return
+
+        if not job.cancelled:
+            await self.edit_status(job, f"✅ {job.title}: готово")
+
+    @staticmethod
+    def _cancel_keyboard(job: Job) -> InlineKeyboardMarkup:
+        return InlineKeyboardMarkup(inline_keyboard=[[
+            InlineKeyboardButton(text="❌ Отменить", callback_data=f"{CANCEL_PREFIX}{job.id}")
+        ]])
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from typing import Optional
+
+from data.cache import reference_cache
+from data.executor import db_executor
+
+
+class EventLoopMonitor:
+    """
+    Измеряет, на сколько event loop был заблокирован: засыпает на interval
+    и считает задержку пробуждения сверх него.
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1, report_interval: float = 300):
+        self.interval = interval
+        self.threshold = threshold
+        self.report_interval = report_interval
+        self.blocked_total = 0.0
+        self.blocked_max = 0.0
+        self.stalls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "blocked_total_s": round(self.blocked_total, 3),
+            "blocked_max_ms": round(self.blocked_max * 1000, 1),
+            "stalls": self.stalls,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            lag = now - started - self.interval
+
+            if lag > 0:
+                self.blocked_total += lag
+                self.blocked_max = max(self.blocked_max, lag)
+            if lag > self.threshold:
+                self.stalls += 1
+                logging.warning(f"Event loop был заблокирован на {lag * 1000:.0f} мс")
+
+            if now - last_report >= self.report_interval:
+                last_report = now
+                logging.info(f"Event loop: {self.stats()}, DB executor: {db_executor.stats()}, "
+                             f"reference cache: {reference_cache.stats()}")
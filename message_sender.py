@@ -1,14 +1,95 @@
+import asyncio
+import os
+import time
+from collections import deque
+
 from aiogram import Bot
 from aiogram.types import InputFile, InputMediaPhoto, InputMediaDocument, InputMediaVideo, InputMediaAnimation
 from aiogram.enums import ParseMode
-from aiogram.exceptions import AiogramError
-from typing import Optional, List, Dict, Any
+from aiogram.exceptions import AiogramError, TelegramRetryAfter
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+
+
+class TokenBucket:
+    """Ограничитель частоты: не больше rate событий в секунду с запасом capacity."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
 
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
 
 
 class MessageSender:
-    def __init__(self, bot: Bot):
+    """
+    Отправка сообщений через очередь: общий и по-чатовый лимит частоты,
+    ограниченное число одновременных отправок и повтор после flood-wait.
+    Пока очередь не запущена (start), сообщения отправляются напрямую.
+    """
+
+    def __init__(self, bot: Bot, global_rate: float = None, per_chat_rate: float = None,
+                 concurrency: int = None, max_queue_size: int = None, max_retries: int = None):
         self.bot = bot
+        self.global_limiter = TokenBucket(global_rate or float(os.getenv("MESSAGE_GLOBAL_RATE", 30)))
+        self.per_chat_rate = per_chat_rate or float(os.getenv("MESSAGE_PER_CHAT_RATE", 1))
+        self.chat_limiters: Dict[int, TokenBucket] = {}
+        self.concurrency = concurrency or int(os.getenv("MESSAGE_SEND_CONCURRENCY", 8))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("MESSAGE_MAX_RETRIES", 3))
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size or int(os.getenv("MESSAGE_QUEUE_SIZE", 1000)))
+        self.workers: List[asyncio.Task] = []
+        self.paused_until = 0.0
+
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.sent_times = deque(maxlen=10000)
+
+    async def start(self):
+        for _ in range(self.concurrency):
+            self.workers.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+        # Неотправленные сообщения отменяются, чтобы send_message и broadcast
+        # не ждали их результата вечно
+        while not self.queue.empty():
+            *_, future = self.queue.get_nowait()
+            future.cancel()
+            self.queue.task_done()
+            # Даём дописать в очередь тем, кто ждал в ней места
+            await asyncio.sleep(0)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        sent_last_minute = sum(1 for t in self.sent_times if now - t <= 60)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "throughput_per_sec": sent_last_minute / 60,
+        }
 
     async def send_message(
             self,
@@ -23,7 +104,8 @@ class MessageSender:
             media_group: Optional[List[Dict[str, Any]]] = None
     ) -> bool:
         """
-        Отправляет сообщение или медиа пользователю
+        Отправляет сообщение или медиа пользователю через очередь отправки.
+        Если очередь заполнена, ждёт места в ней.
 
         :param user_id: ID пользователя
         :param message: Текст сообщения
@@ -36,46 +118,162 @@ class MessageSender:
         :param media_group: Список медиа для отправки как группа (переопределяет media_path/media_type)
         :return: True если сообщение/медиа отправлено успешно, False в случае ошибки
         """
+        kwargs = dict(
+            parse_mode=parse_mode,
+            disable_notification=disable_notification,
+            disable_web_page_preview=disable_web_page_preview,
+            media_path=media_path,
+            media_type=media_type,
+            media_caption=media_caption,
+            media_group=media_group,
+        )
+        if not self.workers:
+            return await self._send_now(user_id, message, kwargs)
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((user_id, message, kwargs, future))
+        return await future
+
+    async def broadcast(
+            self,
+            user_ids: List[int],
+            message: str,
+            on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+            progress_interval: float = 2.0
+    ) -> Dict[int, bool]:
+        """
+        Отправляет одно сообщение нескольким пользователям параллельно.
+        Параллельность и частоту ограничивает очередь отправки.
+
+        :param user_ids: ID получателей
+        :param message: Текст сообщения
+        :param on_progress: Вызывается с (отправлено, всего) не чаще раза в progress_interval секунд
+        :param progress_interval: Минимальный интервал между вызовами on_progress
+        :return: Результат отправки для каждого получателя
+        """
+        async def send(user_id: int):
+            return user_id, await self.send_message(user_id=user_id, message=message)
+
+        results: Dict[int, bool] = {}
+        last_progress = time.monotonic()
+        for task in asyncio.as_completed([send(user_id) for user_id in user_ids]):
+            user_id, ok = await task
+            results[user_id] = ok
+            if on_progress and time.monotonic() - last_progress >= progress_interval:
+                last_progress = time.monotonic()
+                await on_progress(len(results), len(user_ids))
+        return results
+
+    async def _worker(self):
+        while True:
+            user_id, message, kwargs, future = await self.queue.get()
+            try:
+                result = await self._send_limited(user_id, message, kwargs)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                # stop() прервал отправку — ожидающий её результата не должен зависнуть
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def _send_limited(self, user_id: int, message: str, kwargs: dict) -> bool:
+        for attempt in range(self.max_retries + 1):
+            await self._chat_limiter(user_id).acquire()
+            await self.global_limiter.acquire()
+
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            try:
+                await self._deliver(user_id, message, **kwargs)
+                self.sent += 1
+                self.sent_times.append(time.monotonic())
+                return True
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    print(f"Failed to send message to user {user_id}: {e}")
+                    break
+                self.retries += 1
+                # flood-wait касается всего бота, поэтому приостанавливаются все отправки
+                self.paused_until = max(self.paused_until, time.monotonic() + e.retry_after)
+            except AiogramError as e:
+                print(f"Failed to send message to user {user_id}: {e}")
+                break
+
+        self.failed += 1
+        return False
+
+    def _chat_limiter(self, user_id: int) -> TokenBucket:
+        limiter = self.chat_limiters.get(user_id)
+        if limiter is None:
+            if len(self.chat_limiters) > 1000:
+                self.chat_limiters = {k: v for k, v in self.chat_limiters.items() if not v.is_full()}
+            limiter = self.chat_limiters[user_id] = TokenBucket(self.per_chat_rate, capacity=1)
+        return limiter
+
+    async def _send_now(self, user_id: int, message: str, kwargs: dict) -> bool:
         try:
-            if media_group:
-                media_list = []
-                for media_item in media_group:
-                    media_class = self._get_media_class(media_item['type'])
-                    media_list.append(media_class(
-                        media=media_item['path'],
-                        caption=media_item.get('caption', ''),
-                        parse_mode=parse_mode
-                    ))
-                await self.bot.send_media_group(
-                    chat_id=user_id,
-                    media=media_list,
-                    disable_notification=disable_notification
-                )
-            elif media_path and media_type:
-                # Отправка одиночного медиа
-                caption = media_caption if media_caption is not None else message
-                method = self._get_send_method(media_type)
-                await method(
-                    chat_id=user_id,
-                    caption=caption,
-                    parse_mode=parse_mode,
-                    disable_notification=disable_notification,
-                    **{media_type: InputFile(media_path) if not media_path.startswith(('http://', 'https://')) else media_path}
-                )
-            else:
-                # Отправка обычного текстового сообщения
-                await self.bot.send_message(
-                    chat_id=user_id,
-                    text=message,
-                    parse_mode=parse_mode,
-                    disable_notification=disable_notification,
-                    disable_web_page_preview=disable_web_page_preview
-                )
+            await self._deliver(user_id, message, **kwargs)
             return True
         except AiogramError as e:
             print(f"Failed to send message to user {user_id}: {e}")
             return False
 
+    async def _deliver(
+            self,
+            user_id: int,
+            message: str,
+            parse_mode: Optional[str] = ParseMode.HTML,
+            disable_notification: bool = False,
+            disable_web_page_preview: bool = False,
+            media_path: Optional[str] = None,
+            media_type: Optional[str] = None,
+            media_caption: Optional[str] = None,
+            media_group: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Отправляет сообщение или медиа сразу, ошибки Bot API пробрасываются"""
+        if media_group:
+            media_list = []
+            for media_item in media_group:
+                media_class = self._get_media_class(media_item['type'])
+                media_list.append(media_class(
+                    media=media_item['path'],
+                    caption=media_item.get('caption', ''),
+                    parse_mode=parse_mode
+                ))
+            await self.bot.send_media_group(
+                chat_id=user_id,
+                media=media_list,
+                disable_notification=disable_notification
+            )
+        elif media_path and media_type:
+            # Отправка одиночного медиа
+            caption = media_caption if media_caption is not None else message
+            method = self._get_send_method(media_type)
+            await method(
+                chat_id=user_id,
+                caption=caption,
+                parse_mode=parse_mode,
+                disable_notification=disable_notification,
+                **{media_type: InputFile(media_path) if not media_path.startswith(('http://', 'https://')) else media_path}
+            )
+        else:
+            # Отправка обычного текстового сообщения
+            await self.bot.send_message(
+                chat_id=user_id,
+                text=message,
+                parse_mode=parse_mode,
+                disable_notification=disable_notification,
+                disable_web_page_preview=disable_web_page_preview
+            )
+
     def _get_send_method(self, media_type: str):
         """Возвращает метод отправки для указанного типа медиа"""
         methods = {
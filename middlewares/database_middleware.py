@@ -2,12 +2,12 @@ from typing import Any
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
-from data.database import Database
+from data.database import DatabasePool
 
 
 class DatabaseMiddleware(BaseMiddleware):
-    def __init__(self, db: Database):
-        self.db = db
+    def __init__(self, pool: DatabasePool):
+        self.pool = pool
 
     async def __call__(
         self,
@@ -15,5 +15,6 @@ class DatabaseMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict,
     ) -> Any:
-        data["db"] = self.db
-        return await handler(event, data)
\ No newline at end of file
+        async with self.pool.acquire() as db:
+            data["db"] = db
+            return await handler(event, data)
@@ -0,0 +1,37 @@
+from typing import Any
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from data.database import DatabasePool
+from identity_resolver import IdentityResolver
+
+
+class IdentityMiddleware(BaseMiddleware):
+    """
+    Кладёт в данные обработчика is_admin, is_worker и запись работника (worker),
+    поэтому фильтрам роутеров и диалогам не нужно обращаться к БД.
+    Должен регистрироваться после DatabaseMiddleware.
+    """
+
+    def __init__(self, pool: DatabasePool):
+        self.pool = pool
+        self.identity_resolver = IdentityResolver()
+
+    async def startup(self):
+        async with self.pool.acquire() as db:
+            await self.identity_resolver.ensure_fresh(db)
+
+    async def __call__(
+        self,
+        handler,
+        event: TelegramObject,
+        data: dict,
+    ) -> Any:
+        await self.identity_resolver.ensure_fresh(data["db"])
+
+        user = data.get("event_from_user")
+        worker = self.identity_resolver.get_worker(user.id) if user else None
+        data["is_admin"] = user is not None and self.identity_resolver.is_admin(user.id)
+        data["is_worker"] = worker is not None
+        data["worker"] = worker
+        return await handler(event, data)
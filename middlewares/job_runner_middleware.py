@@ -0,0 +1,21 @@
+from typing import Any
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import TelegramObject
+
+from data.database import DatabasePool
+from job_runner import JobRunner
+
+
+class JobRunnerMiddleware(BaseMiddleware):
+    def __init__(self, bot: Bot, pool: DatabasePool):
+        self.job_runner = JobRunner(bot, pool)
+
+    async def __call__(
+        self,
+        handler,
+        event: TelegramObject,
+        data: dict,
+    ) -> Any:
+        data["job_runner"] = self.job_runner
+        return await handler(event, data)
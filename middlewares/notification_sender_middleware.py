@@ -1,14 +1,14 @@
 from typing import Any
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import TelegramObject
-from data.database import Database
+from data.database import DatabasePool
 from message_sender import MessageSender
 from notififcation_sender import NotificationSender
 
 
 class NotificationSenderMiddleware(BaseMiddleware):
-    def __init__(self, bot: Bot, db: Database, message_sender: MessageSender):
-        self.notification_sender = NotificationSender(bot, db, message_sender)
+    def __init__(self, bot: Bot, pool: DatabasePool, message_sender: MessageSender):
+        self.notification_sender = NotificationSender(bot, pool, message_sender)
 
     async def startup(self):
         await self.notification_sender.start()
@@ -1,38 +1,139 @@
 from datetime import datetime, timedelta, timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from typing import Dict
+from typing import Dict, Optional, Set, Tuple
 from aiogram import Bot
 import asyncio
+import os
 
-from data.database import Database
-from data.project_operations import ProjectOperations
-from data.task_operations import TaskOperations
+from data.database import Database, DatabasePool
 from data.time_entry_operations import TimeEntryOperations
 from data.worker_operations import WorkerOperations
 
 
 from message_sender import MessageSender
 
+DAY_MAP = {
+    'понедельник': 'mon',
+    'вторник': 'tue',
+    'среда': 'wed',
+    'четверг': 'thu',
+    'пятница': 'fri',
+    'суббота': 'sat',
+    'воскресенье': 'sun'
+}
+
+ScheduleKey = Tuple[str, int, int]
+
 
 class NotificationSender:
-    def __init__(self, bot: Bot, db: Database, message_sender: MessageSender):
+    def __init__(self, bot: Bot, pool: DatabasePool, message_sender: MessageSender,
+                 grouped: Optional[bool] = None):
         self.bot = bot
-        self.db = db
+        self.pool = pool
         self.message_sender = message_sender
         self.timezone = timezone(timedelta(hours=3))
         self.scheduler = AsyncIOScheduler(timezone=self.timezone)
         self.active_workers: Dict[int, asyncio.Task] = {}
 
+        # В групповом режиме один cron-job на (день, время) отправляет отчёты всем работникам группы
+        self.grouped = grouped if grouped is not None else os.getenv("REPORT_SCHEDULE_MODE", "grouped") == "grouped"
+        self.buckets: Dict[ScheduleKey, Set[int]] = {}
+        self.worker_buckets: Dict[int, ScheduleKey] = {}
+
+        # Отчёт после сохранения записей отправляется один раз после серии изменений
+        self.debounce_seconds = float(os.getenv("REPORT_DEBOUNCE_SECONDS", 60))
+        self.pending_changes: Dict[int, asyncio.Task] = {}
+        self.worker_schedules: Dict[int, ScheduleKey] = {}
+
     async def start(self):
-        workers = WorkerOperations.get_all_workers(self.db)
+        async with self.pool.acquire() as db:
+            workers = await db.run(WorkerOperations.get_all_workers)
         for worker in workers:
-            self._setup_worker_schedule(worker)
+            self._reschedule(worker)
 
         self.scheduler.start()
         print("Notification service started")
 
+    @staticmethod
+    def _schedule_key(worker: Dict) -> ScheduleKey:
+        cron_day = DAY_MAP.get(worker['reminder_day'].lower(), 'fri')
+        hour, minute = map(int, str(worker['reminder_time']).split(':')[:2])
+        return cron_day, hour, minute
+
+    def _add_worker_to_bucket(self, worker: Dict):
+        key = self._schedule_key(worker)
+        old_key = self.worker_buckets.get(worker['id'])
+        if old_key == key:
+            return
+        if old_key is not None:
+            self._remove_worker_from_bucket(worker['id'])
+
+        self.worker_buckets[worker['id']] = key
+        bucket = self.buckets.setdefault(key, set())
+        bucket.add(worker['id'])
+
+        if len(bucket) == 1:
+            cron_day, hour, minute = key
+            self.scheduler.add_job(
+                self._send_bucket_reports,
+                trigger=CronTrigger(day_of_week=cron_day, hour=hour, minute=minute, timezone=self.timezone),
+                args=[key],
+                id=self._bucket_job_id(key),
+                replace_existing=True
+            )
+            print(f"Настроена групповая рассылка отчётов: {cron_day} {hour:02d}:{minute:02d}")
+
+    def _remove_worker_from_bucket(self, worker_id: int):
+        key = self.worker_buckets.pop(worker_id, None)
+        if key is None:
+            return
+        bucket = self.buckets.get(key, set())
+        bucket.discard(worker_id)
+        if not bucket:
+            self.buckets.pop(key, None)
+            job = self.scheduler.get_job(self._bucket_job_id(key))
+            if job:
+                job.remove()
+
+    @staticmethod
+    def _bucket_job_id(key: ScheduleKey) -> str:
+        cron_day, hour, minute = key
+        return f"weekly_report_{cron_day}_{hour:02d}{minute:02d}"
+
+    async def _send_bucket_reports(self, key: ScheduleKey):
+        worker_ids = list(self.buckets.get(key, ()))
+        if not worker_ids:
+            return
+
+        start_of_week, today = self._current_week()
+        async with self.pool.acquire() as db:
+            workers = await db.run(WorkerOperations.get_workers_by_ids, worker_ids)
+            summary = await db.run(TimeEntryOperations.get_time_summaries, worker_ids, start_of_week, today)
+
+        rows_by_worker = {}
+        for row in summary:
+            rows_by_worker.setdefault(row['worker_id'], []).append(row)
+
+        # Частоту отправки ограничивает очередь MessageSender
+        await asyncio.gather(*(
+            self._send_message(
+                worker['telegram_id'],
+                "Ваш еженедельный отчет:\n\n" + self._format_report(rows_by_worker.get(worker['id'], []))
+            )
+            for worker in workers
+        ))
+
+    def _current_week(self):
+        today = datetime.now(self.timezone).date()
+        return today - timedelta(days=today.weekday()), today
+
     def _setup_worker_schedule(self, worker: Dict):
+        key = self._schedule_key(worker)
+        if self.worker_schedules.get(worker['id']) == key:
+            return
+        self.worker_schedules[worker['id']] = key
+
         telegram_id = worker['telegram_id']
         if telegram_id in self.active_workers:
             self.active_workers[telegram_id].cancel()
@@ -44,18 +145,7 @@ class NotificationSender:
         reminder_day = worker['reminder_day']
         reminder_time = worker['reminder_time']
 
-        day_map = {
-            'понедельник': 'mon',
-            'вторник': 'tue',
-            'среда': 'wed',
-            'четверг': 'thu',
-            'пятница': 'fri',
-            'суббота': 'sat',
-            'воскресенье': 'sun'
-        }
-
-        cron_day = day_map.get(reminder_day.lower(), 'fri')
-        hour, minute = map(int, str(reminder_time).split(':')[:2])
+        cron_day, hour, minute = self._schedule_key(worker)
 
         trigger = CronTrigger(
             day_of_week=cron_day,
@@ -85,66 +175,61 @@ class NotificationSender:
         print("-" * 40)
 
     async def _send_weekly_report(self, worker_id: int):
-        worker = WorkerOperations.get_worker(self.db, worker_id)
-        if not worker:
-            print("Worker not found")
-            return
-
-        report = ["Ваш еженедельный отчет:\n"]
-        today = datetime.now(self.timezone).date()
-        start_of_week = today - timedelta(days=today.weekday())
-
-        project_report = await self._generate_report(
-            worker_id,
-            datetime.combine(start_of_week, datetime.min.time()).replace(tzinfo=self.timezone),
-            datetime.combine(today, datetime.max.time()).replace(tzinfo=self.timezone)
-        )
+        async with self.pool.acquire() as db:
+            worker = await db.run(WorkerOperations.get_worker, worker_id)
+            if not worker:
+                print("Worker not found")
+                return
+
+            report = ["Ваш еженедельный отчет:\n"]
+            start_of_week, today = self._current_week()
+
+            project_report = await self._generate_report(
+                db,
+                worker_id,
+                datetime.combine(start_of_week, datetime.min.time()).replace(tzinfo=self.timezone),
+                datetime.combine(today, datetime.max.time()).replace(tzinfo=self.timezone)
+            )
 
         report.append(project_report)
 
         await self._send_message(worker['telegram_id'], "\n".join(report))
 
-    async def _generate_report(self, worker_id: int, start_date: datetime,
+    async def _generate_report(self, db: Database, worker_id: int, start_date: datetime,
                                end_date: datetime) -> str:
-        all_time_entries = TimeEntryOperations.get_time_entries(
-            self.db,
+        summary = await db.run(
+            TimeEntryOperations.get_time_summary,
             worker_id,
-            start_date=start_date,
-            end_date=end_date
+            start_date.date(),
+            end_date.date()
         )
+        return self._format_report(summary)
 
+    @staticmethod
+    def _format_report(summary) -> str:
         projects_data = {}
         total_week_hours = 0.0
 
-        for entry in all_time_entries:
-            project_id = entry['project_id']
-            if project_id not in projects_data:
-                project = ProjectOperations.get_project(self.db, project_id)
-                projects_data[project_id] = {
-                    'name': project['name'],
-                    'total_hours': 0,
-                    'tasks': {}
-                }
-
-            task_id = entry['task_id']
-            if task_id not in projects_data[project_id]['tasks']:
-                task = TaskOperations.get_task(self.db, task_id)
-                projects_data[project_id]['tasks'][task_id] = {
-                    'name': task['name'],
-                    'font_name': entry.get('font_name', ''),
-                    'hours': 0
-                }
-
-            projects_data[project_id]['tasks'][task_id]['hours'] += entry['hours']
-            projects_data[project_id]['total_hours'] += entry['hours']
-            total_week_hours += entry['hours']
+        for row in summary:
+            project_data = projects_data.setdefault(row['project_id'], {
+                'name': row['project_name'],
+                'total_hours': 0,
+                'tasks': []
+            })
+            project_data['tasks'].append({
+                'name': row['task_name'],
+                'font_name': row['font_name'] or '',
+                'hours': row['hours']
+            })
+            project_data['total_hours'] += row['hours']
+            total_week_hours += row['hours']
 
         report_lines = []
 
         for project_id, project_data in projects_data.items():
             report_lines.append(f"\n{project_data['name']}:")
 
-            for task_id, task_data in project_data['tasks'].items():
+            for task_data in project_data['tasks']:
                 if task_data['hours'] > 0:
                     report_lines.append(
                         f" - {task_data['name']}|{task_data['font_name']}: {task_data['hours']:.1f} ч."
@@ -165,13 +250,49 @@ class NotificationSender:
         except Exception as e:
             print(f"Failed to send message to {telegram_id}: {e}")
 
-    async def on_data_changed(self, worker_id: int):
-        worker = WorkerOperations.get_worker(self.db, worker_id)
-        self._setup_worker_schedule(worker)
-        await self._send_weekly_report(worker_id)
+    def on_settings_changed(self, worker: Dict, reminder_day: str, reminder_time: str):
+        """
+        Сразу перепланирует напоминание работника на новые день и время, чтобы
+        напоминание в ближайшие минуты не ушло по старому расписанию. Отчёт
+        отправляется с задержкой, как в on_data_changed.
+        """
+        self._reschedule({**worker, 'reminder_day': reminder_day, 'reminder_time': reminder_time})
+        self.on_data_changed(worker['id'])
+
+    def _reschedule(self, worker: Dict):
+        # Перепланирование происходит, только если изменились день или время напоминания
+        if self.grouped:
+            self._add_worker_to_bucket(worker)
+        else:
+            self._setup_worker_schedule(worker)
+
+    def on_data_changed(self, worker_id: int):
+        """
+        Планирует отправку отчёта работнику. Повторные вызовы в течение
+        debounce_seconds переносят отправку, так что после серии сохранений
+        уходит один отчёт. Обработчик не ждёт ни запросов, ни отправки.
+        """
+        pending = self.pending_changes.get(worker_id)
+        if pending:
+            pending.cancel()
+        self.pending_changes[worker_id] = asyncio.create_task(self._apply_data_change(worker_id))
+
+    async def _apply_data_change(self, worker_id: int):
+        try:
+            await asyncio.sleep(self.debounce_seconds)
+        except asyncio.CancelledError:
+            return
+        self.pending_changes.pop(worker_id, None)
+
+        try:
+            await self._send_weekly_report(worker_id)
+        except Exception as e:
+            print(f"Failed to process data change for worker {worker_id}: {e}")
 
     async def stop(self):
         self.scheduler.shutdown()
+        for task in self.pending_changes.values():
+            task.cancel()
         for task in self.active_workers.values():
             task.cancel()
         await asyncio.gather(*self.active_workers.values(), return_exceptions=True)
@@ -0,0 +1,378 @@
+import csv
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+from enum import Enum
+from typing import List, Optional, TextIO, Tuple
+
+from psycopg2.extras import DictCursor
+
+from data.database import Database
+
+
+class GroupBy(Enum):
+    PROJECT = "проект"
+    STAGE = "этап"
+    DEPARTMENT = "отдел"
+    FONT = "шрифт"
+    WORKER = "сотрудник"
+
+
+class Period(Enum):
+    """Шаг разбивки по времени, значение — единица date_trunc"""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
+
+
+# Для каждого разреза: выражение группировки, подпись и нужные соединения
+DIMENSIONS = {
+    GroupBy.PROJECT: ("prj.id", "prj.name", ("pt", "prj")),
+    GroupBy.STAGE: ("t.stage", "COALESCE(t.stage, 'без этапа')", ("pt", "t")),
+    GroupBy.DEPARTMENT: ("t.department", "COALESCE(t.department, 'без отдела')", ("pt", "t")),
+    GroupBy.FONT: ("f.id", "COALESCE(f.name, 'без шрифта')", ("pt", "f")),
+    GroupBy.WORKER: ("w.id", "w.name", ("w",)),
+}
+
+# Соединения в порядке, в котором их можно подключать к time_entry te
+JOINS = {
+    "pt": "JOIN project_task pt ON pt.id = te.project_task_id",
+    "prj": "JOIN project prj ON prj.id = pt.project_id",
+    "t": "JOIN task t ON t.id = pt.task_id",
+    "f": "LEFT JOIN font f ON f.id = pt.font_id",
+    "w": "JOIN worker w ON w.id = te.worker_id",
+}
+
+# Те же соединения для недельных сумм: в них уже есть project_id
+WEEKLY_JOINS = {
+    "prj": "JOIN project prj ON prj.id = te.project_id",
+    "w": "JOIN worker w ON w.id = te.worker_id",
+}
+
+# Разрезы, которые можно посчитать по time_entry_weekly
+WEEKLY_DIMENSIONS = {GroupBy.PROJECT, GroupBy.WORKER}
+
+
+@dataclass(frozen=True)
+class ReportFilter:
+    """
+    Фильтр отчёта. None не ограничивает выборку. Фильтры комбинируются
+    через &: периоды пересекаются, списки значений тоже.
+    """
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    project_ids: Optional[Tuple[int, ...]] = None
+    worker_ids: Optional[Tuple[int, ...]] = None
+    departments: Optional[Tuple[str, ...]] = None
+    stages: Optional[Tuple[str, ...]] = None
+    font_ids: Optional[Tuple[int, ...]] = None
+
+    def __and__(self, other: "ReportFilter") -> "ReportFilter":
+        return ReportFilter(
+            start_date=max(filter(None, (self.start_date, other.start_date)), default=None),
+            end_date=min(filter(None, (self.end_date, other.end_date)), default=None),
+            project_ids=_intersect(self.project_ids, other.project_ids),
+            worker_ids=_intersect(self.worker_ids, other.worker_ids),
+            departments=_intersect(self.departments, other.departments),
+            stages=_intersect(self.stages, other.stages),
+            font_ids=_intersect(self.font_ids, other.font_ids),
+        )
+
+    def conditions(self) -> Tuple[List[str], dict, set]:
+        """Условия WHERE для time_entry te, их параметры и нужные для них соединения"""
+        conditions, params, joins = [], {}, set()
+        if self.start_date:
+            conditions.append("te.entry_date >= %(start_date)s")
+            params["start_date"] = self.start_date
+        if self.end_date:
+            conditions.append("te.entry_date <= %(end_date)s")
+            params["end_date"] = self.end_date
+        if self.worker_ids is not None:
+            conditions.append("te.worker_id = ANY(%(worker_ids)s)")
+            params["worker_ids"] = list(self.worker_ids)
+        if self.project_ids is not None:
+            conditions.append("pt.project_id = ANY(%(project_ids)s)")
+            params["project_ids"] = list(self.project_ids)
+            joins.add("pt")
+        if self.font_ids is not None:
+            conditions.append("pt.font_id = ANY(%(font_ids)s)")
+            params["font_ids"] = list(self.font_ids)
+            joins.add("pt")
+        if self.departments is not None:
+            conditions.append("t.department = ANY(%(departments)s)")
+            params["departments"] = list(self.departments)
+            joins.update(("pt", "t"))
+        if self.stages is not None:
+            conditions.append("t.stage = ANY(%(stages)s)")
+            params["stages"] = list(self.stages)
+            joins.update(("pt", "t"))
+        return conditions, params, joins
+
+
+@dataclass(frozen=True)
+class ReportRow:
+    labels: Tuple[str, ...]
+    period_start: Optional[date]
+    hours: float
+    entries: int
+
+
+@dataclass
+class Report:
+    group_by: Tuple[GroupBy, ...]
+    period: Optional[Period]
+    filters: ReportFilter
+    rows: List[ReportRow] = field(default_factory=list)
+
+    @property
+    def total_hours(self) -> float:
+        return sum(row.hours for row in self.rows)
+
+    def header(self) -> List[str]:
+        header = [dimension.value for dimension in self.group_by]
+        if self.period:
+            header.append("период")
+        return header + ["часы", "записей"]
+
+    def records(self) -> List[list]:
+        return [
+            list(row.labels) + ([row.period_start] if self.period else []) + [row.hours, row.entries]
+            for row in self.rows
+        ]
+
+    def write_csv(self, output: TextIO):
+        writer = csv.writer(output)
+        writer.writerow(self.header())
+        writer.writerows(self.records())
+
+
+@dataclass(frozen=True)
+class PlanFactRow:
+    worker_id: int
+    worker_name: str
+    department: Optional[str]
+    period_start: date
+    planned_hours: float
+    actual_hours: float
+
+    @property
+    def deviation(self) -> float:
+        return self.actual_hours - self.planned_hours
+
+    @property
+    def utilization(self) -> Optional[float]:
+        return self.actual_hours / self.planned_hours if self.planned_hours else None
+
+
+@dataclass
+class PlanFactReport:
+    period: Period
+    filters: ReportFilter
+    rows: List[PlanFactRow] = field(default_factory=list)
+
+    def header(self) -> List[str]:
+        return ["сотрудник", "отдел", "период", "план", "факт", "отклонение", "загрузка"]
+
+    def records(self) -> List[list]:
+        return [
+            [row.worker_name, row.department, row.period_start, row.planned_hours, row.actual_hours,
+             row.deviation, row.utilization]
+            for row in self.rows
+        ]
+
+    def write_csv(self, output: TextIO):
+        writer = csv.writer(output)
+        writer.writerow(self.header())
+        writer.writerows(self.records())
+
+
+class ReportGenerator:
+    @staticmethod
+    def hours(db: Database, group_by: Tuple[GroupBy, ...], filters: ReportFilter = ReportFilter(),
+              period: Optional[Period] = None) -> Report:
+        """
+        Часы по выбранным разрезам (и, если задан period, по периодам).
+        Агрегация выполняется в БД; подключаются только нужные таблицы.
+        Полные недели по проектам и сотрудникам берутся из time_entry_weekly.
+        """
+        source, conditions, params, joins, joins_map, entries = _source(group_by, filters, period)
+        keys, labels = [], []
+        for dimension in group_by:
+            key, label, dimension_joins = DIMENSIONS[dimension]
+            keys.append(key)
+            labels.append(label)
+            joins.update(dimension_joins)
+
+        if period:
+            keys.append("date_trunc(%(period)s, te.entry_date)::date")
+            params["period"] = period.value
+
+        select = [f"{label} AS label_{index}" for index, label in enumerate(labels)]
+        select.append(f"{keys[-1]} AS period_start" if period else "NULL::date AS period_start")
+        group = keys + labels
+        order = (["period_start"] if period else []) + ["hours DESC"]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        group_clause = f"GROUP BY {', '.join(group)}" if group else ""
+
+        query = f"""
+            SELECT {', '.join(select)},
+                   SUM(te.hours) AS hours,
+                   {entries} AS entries
+            FROM {source}
+            {_joins(joins, joins_map)}
+            {where}
+            {group_clause}
+            ORDER BY {', '.join(order)}
+        """
+
+        with db.conn.cursor() as cursor:
+            cursor.execute(query, params)
+            rows = [
+                ReportRow(labels=tuple(row[:len(labels)]), period_start=row[-3], hours=row[-2], entries=row[-1])
+                for row in cursor.fetchall()
+            ]
+        db.conn.rollback()
+        return Report(group_by=tuple(group_by), period=period, filters=filters, rows=rows)
+
+    @staticmethod
+    def plan_vs_actual(db: Database, start_date: date, end_date: date, filters: ReportFilter = ReportFilter(),
+                       period: Period = Period.WEEK) -> PlanFactReport:
+        """
+        План и факт по сотрудникам за период. План — worker.weekly_hours,
+        распределённые по рабочим дням (пн–пт) внутри [start_date, end_date].
+        Отделы в фильтре здесь относятся к должности сотрудника, а не к
+        задаче; сотрудники без weekly_hours попадают с нулевым планом.
+        """
+        filters = filters & ReportFilter(start_date=start_date, end_date=end_date)
+        source, conditions, params, joins, joins_map, _ = _source((GroupBy.WORKER,),
+                                                                  replace(filters, departments=None), period)
+        params["period"] = period.value
+
+        worker_conditions = []
+        if filters.worker_ids is not None:
+            worker_conditions.append("w.id = ANY(%(worker_ids)s)")
+        if filters.departments is not None:
+            worker_conditions.append("pos.department = ANY(%(departments)s)")
+            params["departments"] = list(filters.departments)
+        worker_where = f"WHERE {' AND '.join(worker_conditions)}" if worker_conditions else ""
+
+        query = f"""
+            WITH workers AS (
+                SELECT w.id, w.name, w.weekly_hours, pos.department
+                FROM worker w
+                LEFT JOIN position pos ON pos.id = w.position_id
+                {worker_where}
+            ),
+            plan AS (
+                SELECT workers.id AS worker_id,
+                       date_trunc(%(period)s, d)::date AS period_start,
+                       SUM(COALESCE(workers.weekly_hours, 0) / 5.0) AS planned
+                FROM workers
+                CROSS JOIN generate_series(%(start_date)s::date, %(end_date)s::date, '1 day') d
+                WHERE extract(isodow FROM d) < 6
+                GROUP BY 1, 2
+            ),
+            fact AS (
+                SELECT te.worker_id,
+                       date_trunc(%(period)s, te.entry_date)::date AS period_start,
+                       SUM(te.hours) AS actual
+                FROM {source}
+                {_joins(joins, joins_map)}
+                WHERE {' AND '.join(conditions + ['te.worker_id IN (SELECT id FROM workers)'])}
+                GROUP BY 1, 2
+            )
+            SELECT workers.id, workers.name, workers.department,
+                   COALESCE(plan.period_start, fact.period_start) AS period_start,
+                   COALESCE(plan.planned, 0) AS planned,
+                   COALESCE(fact.actual, 0) AS actual
+            FROM plan
+            FULL JOIN fact ON fact.worker_id = plan.worker_id AND fact.period_start = plan.period_start
+            JOIN workers ON workers.id = COALESCE(plan.worker_id, fact.worker_id)
+            ORDER BY workers.name, period_start
+        """
+
+        with db.conn.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute(query, params)
+            rows = [
+                PlanFactRow(
+                    worker_id=row["id"],
+                    worker_name=row["name"],
+                    department=row["department"],
+                    period_start=row["period_start"],
+                    planned_hours=float(row["planned"]),
+                    actual_hours=float(row["actual"]),
+                )
+                for row in cursor.fetchall()
+            ]
+        db.conn.rollback()
+        return PlanFactReport(period=period, filters=filters, rows=rows)
+
+
+def _source(group_by: Tuple[GroupBy, ...], filters: ReportFilter,
+            period: Optional[Period]) -> Tuple[str, List[str], dict, set, dict, str]:
+    """
+    Источник строк для агрегации: выражение FROM с псевдонимом te, условия
+    WHERE, параметры, нужные для условий соединения, доступные соединения и
+    выражение для числа записей.
+
+    Если разрезы и фильтры не требуют задач и шрифтов, а разбивка не мельче
+    недели, полные недели периода читаются из time_entry_weekly, а из
+    time_entry — только неполные недели по краям периода.
+    """
+    conditions, params, joins = filters.conditions()
+    raw = "time_entry te", conditions, params, joins, JOINS, "COUNT(*)"
+    if period not in (None, Period.WEEK) or not set(group_by) <= WEEKLY_DIMENSIONS or joins - {"pt"} \
+            or filters.font_ids is not None:
+        return raw
+
+    start, end = filters.start_date, filters.end_date
+    # Первый понедельник и последнее воскресенье внутри периода
+    full_start = start + timedelta(days=-start.weekday() % 7) if start else None
+    full_end = end - timedelta(days=(end.weekday() + 1) % 7) if end else None
+    if full_start and full_end and full_start > full_end:
+        return raw
+
+    weekly_conditions, edge_conditions, edges = [], [], []
+    if filters.worker_ids is not None:
+        weekly_conditions.append("worker_id = ANY(%(worker_ids)s)")
+        edge_conditions.append("te.worker_id = ANY(%(worker_ids)s)")
+    if filters.project_ids is not None:
+        weekly_conditions.append("project_id = ANY(%(project_ids)s)")
+        edge_conditions.append("pt.project_id = ANY(%(project_ids)s)")
+    if full_start:
+        weekly_conditions.append("week_start >= %(full_start)s")
+        params["full_start"] = full_start
+    if full_end:
+        weekly_conditions.append("week_start <= %(full_end)s - 6")
+        params["full_end"] = full_end
+    if start and start < full_start:
+        edges.append("te.entry_date BETWEEN %(start_date)s AND %(full_start)s - 1")
+    if end and end > full_end:
+        edges.append("te.entry_date BETWEEN %(full_end)s + 1 AND %(end_date)s")
+
+    source = f"""
+        SELECT worker_id, project_id, week_start AS entry_date, hours, entries
+        FROM time_entry_weekly
+        {'WHERE ' + ' AND '.join(weekly_conditions) if weekly_conditions else ''}
+    """
+    if edges:
+        edge_where = " AND ".join(["(" + " OR ".join(edges) + ")"] + edge_conditions)
+        source += f"""
+        UNION ALL
+        SELECT te.worker_id, pt.project_id, te.entry_date, te.hours, 1
+        FROM time_entry te
+        JOIN project_task pt ON pt.id = te.project_task_id
+        WHERE {edge_where}
+        """
+    return f"({source}) te", [], params, set(), WEEKLY_JOINS, "SUM(te.entries)"
+
+
+def _joins(names: set, joins: dict) -> str:
+    return " ".join(joins[name] for name in joins if name in names)
+
+
+def _intersect(first: Optional[tuple], second: Optional[tuple]) -> Optional[tuple]:
+    if first is None or second is None:
+        return second if first is None else first
+    return tuple(value for value in first if value in second)
@@ -13,14 +13,13 @@ from dialogs.admin.edit_project import edit_project_dialog, EditProjectState
 from dialogs.admin.edit_worker import edit_worker_dialog, EditWorkerState
 from dialogs.admin.get_tables import get_tables_dialog, GetTablesState
 from dialogs.admin.get_time_entries import get_time_entries_dialog, TimeEntryExportState
+from dialogs.admin.reports import reports_dialog, ReportState
 from dialogs.admin.send_message import send_message_dialog, SendMessageState
-from utils import is_admin
-
 
 
 class AdminFilter(BaseFilter):
-    async def __call__(self, message: types.Message) -> bool:
-        return is_admin(message.from_user.id)
+    async def __call__(self, message: types.Message, is_admin: bool) -> bool:
+        return is_admin
 
 async def show_main_keyboard(message: types.Message):
     keyboard = ReplyKeyboardMarkup(
@@ -36,6 +35,7 @@ async def show_main_keyboard(message: types.Message):
             [KeyboardButton(text="Отправить сообщение")],
             [KeyboardButton(text="Получить таблицы")],
             [KeyboardButton(text="Получить таблицу учёта времени")],
+            [KeyboardButton(text="Отчёты")],
         ],
         resize_keyboard=True
     )
@@ -58,6 +58,7 @@ admin_router.include_router(edit_worker_dialog())
 admin_router.include_router(send_message_dialog())
 admin_router.include_router(get_tables_dialog())
 admin_router.include_router(get_time_entries_dialog())
+admin_router.include_router(reports_dialog())
 
 
 @admin_router.message(Command("start"))
@@ -109,3 +110,6 @@ async def create_task_handler(message: types.Message, dialog_manager: DialogMana
 async def create_task_handler(message: types.Message, dialog_manager: DialogManager):
     await dialog_manager.start(TimeEntryExportState.main, mode=StartMode.RESET_STACK)
 
+@admin_router.message(F.text == "Отчёты")
+async def reports_handler(message: types.Message, dialog_manager: DialogManager):
+    await dialog_manager.start(ReportState.main, mode=StartMode.RESET_STACK)
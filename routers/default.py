@@ -5,12 +5,11 @@ from aiogram.filters import Command, BaseFilter
 from aiogram_dialog import DialogManager, StartMode
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 
-from utils import is_admin, is_worker
 
 
 class DefaultFilter(BaseFilter):
-    async def __call__(self, message: types.Message) -> bool:
-        return not is_admin(message.from_user.id) and not is_worker(message.from_user.id)
+    async def __call__(self, message: types.Message, is_admin: bool, is_worker: bool) -> bool:
+        return not is_admin and not is_worker
 
 
 
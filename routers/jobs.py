@@ -0,0 +1,15 @@
+from aiogram import Router, F, types
+
+from job_runner import JobRunner, CANCEL_PREFIX
+
+
+jobs_router = Router()
+
+
+@jobs_router.callback_query(F.data.startswith(CANCEL_PREFIX))
+async def cancel_job(callback: types.CallbackQuery, job_runner: JobRunner):
+    job_id = int(callback.data[len(CANCEL_PREFIX):])
+    if await job_runner.cancel(job_id, callback.from_user.id):
+        await callback.answer("Задача отменена")
+    else:
+        await callback.answer("Задача уже завершена")
@@ -10,12 +10,10 @@ from dialogs.worker.import_time_table import import_time_table_dialog, ImportTim
 from dialogs.worker.select_projects import select_projects_dialog, ProjectSelectStates
 from dialogs.worker.view_time_entry import ViewTimeEntriesStates, view_time_entries_dialog
 
-from utils import is_worker
-
 
 class WorkerFilter(BaseFilter):
-    async def __call__(self, message: types.Message) -> bool:
-        return is_worker(message.from_user.id)
+    async def __call__(self, message: types.Message, is_worker: bool) -> bool:
+        return is_worker
 
 
 async def show_main_keyboard(message: types.Message):
@@ -0,0 +1,141 @@
+"""
+Разбор и формирование xlsx-табелей. Модуль не зависит от БД и aiogram:
+функции выполняются в процессах cpu_executor и принимают и возвращают
+только байты и кортежи.
+"""
+from datetime import date
+from io import BytesIO
+from typing import List, Tuple
+
+import pandas as pd
+import xlsxwriter
+
+TIME_TABLE_COLUMNS = ['Тип', 'project_task_id', 'Проект', 'Шрифт', 'Задача']
+
+
+def render_time_table(projects: list, records: list, start_date: date, end_date: date) -> bytes:
+    """Собирает табель и возвращает содержимое xlsx-файла"""
+    return export_to_excel(build_time_table(projects, records, start_date, end_date)).getvalue()
+
+
+def parse_time_table(content: bytes) -> Tuple[List[tuple], List[int], date, date]:
+    """
+    Разбирает загруженный табель. Возвращает записи (project_task_id, entry_date,
+    hours), id задач табеля и диапазон дат его колонок.
+    """
+    df = pd.read_excel(BytesIO(content), sheet_name="Табель")
+    df = df[df["Тип"] == "Задача"]
+
+    task_ids = [int(task_id) for task_id in df["project_task_id"].unique()]
+    date_columns = pd.to_datetime(pd.Index(df.columns[5:]), format="%d.%m.%Y")
+    if date_columns.empty or not task_ids:
+        return [], task_ids, None, None
+
+    entries = sheet_to_entries(df)
+    return (
+        [(int(task_id), entry_date, float(hours))
+         for task_id, entry_date, hours in entries.itertuples(index=False, name=None)],
+        task_ids,
+        date_columns.min().date(),
+        date_columns.max().date(),
+    )
+
+
+def sheet_to_entries(df: pd.DataFrame) -> pd.DataFrame:
+    """Переводит табель в длинный формат: project_task_id, entry_date, hours"""
+    date_columns = list(df.columns[5:])
+    entries = df.melt(id_vars=["project_task_id"], value_vars=date_columns,
+                      var_name="entry_date", value_name="hours")
+    entries = entries[entries["hours"].notna() & (entries["hours"] != '')]
+
+    entries = entries.assign(
+        project_task_id=entries["project_task_id"].astype(int),
+        entry_date=pd.to_datetime(entries["entry_date"], format="%d.%m.%Y").dt.date,
+        hours=entries["hours"].astype(float),
+    )
+    return entries.drop_duplicates(["project_task_id", "entry_date"], keep="last")
+
+
+def build_time_table(projects: list, records: list, start_date: date, end_date: date) -> pd.DataFrame:
+    """
+    Собирает табель из строк (project_id, project_task_id, task_name, font_name,
+    entry_date, hours): строка проекта, под ней его задачи, часы по датам в колонках.
+    """
+    all_dates = pd.date_range(start_date, end_date, freq='D').date
+    date_columns = [d.strftime('%d.%m.%Y') for d in all_dates]
+
+    entries = pd.DataFrame(records, columns=['project_id', 'project_task_id', 'task_name', 'font_name',
+                                             'entry_date', 'hours'])
+    tasks = entries.drop_duplicates('project_task_id')[['project_id', 'project_task_id', 'task_name', 'font_name']]
+
+    dated = entries.dropna(subset=['entry_date'])
+    if dated.empty:
+        hours = pd.DataFrame(index=pd.Index([], name='project_task_id'), columns=all_dates, dtype=float)
+    else:
+        hours = dated.pivot_table(
+            index='project_task_id', columns='entry_date', values='hours', aggfunc='sum'
+        ).reindex(columns=all_dates)
+    hours.columns = date_columns
+    tasks = tasks.join(hours, on='project_task_id')
+
+    project_order = {project_id: order for order, (project_id, _) in enumerate(projects)}
+    tasks = tasks.assign(project_order=tasks['project_id'].map(project_order)) \
+        .sort_values(['project_order', 'task_name'], kind='stable')
+
+    frames = []
+    for project_id, project_name in projects:
+        frames.append(pd.DataFrame([{'Тип': 'Проект', 'project_task_id': '', 'Проект': project_name,
+                                     'Шрифт': '', 'Задача': ''}]))
+        project_tasks = tasks[tasks['project_id'] == project_id]
+        frames.append(pd.DataFrame({
+            'Тип': 'Задача',
+            'project_task_id': project_tasks['project_task_id'],
+            'Проект': project_name,
+            'Шрифт': project_tasks['font_name'].fillna(''),
+            'Задача': project_tasks['task_name'],
+            **{col: project_tasks[col] for col in date_columns},
+        }))
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return df.reindex(columns=TIME_TABLE_COLUMNS + date_columns)
+
+
+def export_to_excel(df: pd.DataFrame) -> BytesIO:
+    """
+    Пишет табель в xlsx. Каждая ячейка записывается один раз, формат задаётся
+    на участок строки, а constant_memory сбрасывает строки на диск по мере записи.
+    """
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Табель')
+
+    header_format = workbook.add_format({
+        'bold': True, 'text_wrap': True, 'valign': 'top',
+        'fg_color': '#D7E4BC', 'border': 1, 'align': 'center',
+        'rotation': 90
+    })
+    project_format = workbook.add_format({'bold': True, 'fg_color': '#B7DEE8', 'border': 1})
+    task_format = workbook.add_format({'border': 1})
+    hour_format = workbook.add_format({'num_format': '0.00', 'border': 1, 'align': 'center'})
+
+    for col_num, col in enumerate(df.columns):
+        worksheet.set_column(col_num, col_num,
+                             12 if col == 'project_task_id' else 18 if col in ['Проект', 'Шрифт', 'Задача'] else 8)
+    worksheet.write_row(0, 0, list(df.columns), header_format)
+
+    info_count = len(TIME_TABLE_COLUMNS)
+    info = df[TIME_TABLE_COLUMNS].fillna('').values.tolist()
+    hours = df[df.columns[info_count:]].astype(object)
+    hours = hours.where(hours.notna() & (hours != ''), None).values.tolist()
+
+    for row_idx, (row_info, row_hours) in enumerate(zip(info, hours), start=1):
+        if row_info[0] == 'Проект':
+            worksheet.write_row(row_idx, 0, row_info + [None] * len(row_hours), project_format)
+        else:
+            worksheet.write_row(row_idx, 0, row_info, task_format)
+            worksheet.write_row(row_idx, info_count, [None if h is None else float(h) for h in row_hours],
+                                hour_format)
+
+    workbook.close()
+    output.seek(0)
+    return output
@@ -20,7 +20,7 @@ from aiogram_dialog.widgets.common.items import (
     get_items_getter,
 )
 from aiogram_dialog.widgets.kbd import Keyboard
-from aiogram_dialog.widgets.text import Case, Text
+from aiogram_dialog.widgets.text import Case, Const, Text
 from aiogram_dialog.widgets.widget_event import (
     WidgetEventProcessor,
     ensure_event_processor,
@@ -125,6 +125,109 @@ class Select(Keyboard, Generic[T]):
         return True
 
 
+class PaginatedSelect(Select[T], Generic[T]):
+    """
+    Select, который показывает одну страницу, загруженную геттером.
+
+    Виджет хранит стек курсоров (ключей последнего элемента предыдущих страниц),
+    геттер читает текущий курсор через get_cursor и должен вернуть под ключом
+    has_next признак наличия следующей страницы.
+    """
+    NEXT = ">"
+    PREV = "<"
+
+    def __init__(
+            self,
+            text: Text,
+            id: str,
+            item_id_getter: ItemIdGetter,
+            items: ItemsGetterVariant,
+            cursor_getter: Callable[[Any], str],
+            has_next: str = "has_next",
+            prev_text: Text = Const("⬅️"),
+            next_text: Text = Const("➡️"),
+            type_factory: TypeFactory[T] = str,
+            on_click: Union[
+                OnItemClick["PaginatedSelect[T]", T], WidgetEventProcessor, None,
+            ] = None,
+            when: WhenCondition = None,
+    ):
+        super().__init__(
+            text=text, id=id, item_id_getter=item_id_getter, items=items,
+            type_factory=type_factory, on_click=on_click, when=when,
+        )
+        self.cursor_getter = cursor_getter
+        self.has_next = has_next
+        self.prev_text = prev_text
+        self.next_text = next_text
+
+    def _get_cursors(self, manager: DialogManager) -> list[str]:
+        return self.get_widget_data(manager, [])
+
+    def get_cursor(self, manager: DialogManager) -> Optional[str]:
+        cursors = self._get_cursors(manager)
+        return cursors[-1] if cursors else None
+
+    def reset(self, manager: DialogManager) -> None:
+        self.set_widget_data(manager, [])
+
+    async def _render_keyboard(
+            self,
+            data: dict,
+            manager: DialogManager,
+    ) -> RawKeyboard:
+        items = list(self.items_getter(data))
+        keyboard = [
+            [await self._render_button(pos, item, item, data, manager)]
+            for pos, item in enumerate(items)
+        ]
+
+        navigation = []
+        if self._get_cursors(manager):
+            navigation.append(InlineKeyboardButton(
+                text=await self.prev_text.render_text(data, manager),
+                callback_data=self._item_callback_data(self.PREV),
+            ))
+        if items and data.get(self.has_next):
+            navigation.append(InlineKeyboardButton(
+                text=await self.next_text.render_text(data, manager),
+                callback_data=self._item_callback_data(
+                    self.NEXT + self.cursor_getter(items[-1]),
+                ),
+            ))
+        if navigation:
+            keyboard.append(navigation)
+        return keyboard
+
+    async def _process_item_callback(
+            self,
+            callback: CallbackQuery,
+            data: str,
+            dialog: DialogProtocol,
+            manager: DialogManager,
+    ) -> bool:
+        if data.startswith(self.NEXT):
+            self.set_widget_data(manager, self._get_cursors(manager) + [data[len(self.NEXT):]])
+            return True
+        if data == self.PREV:
+            self.set_widget_data(manager, self._get_cursors(manager)[:-1])
+            return True
+        return await super()._process_item_callback(callback, data, dialog, manager)
+
+    def managed(self, manager: DialogManager) -> "ManagedPaginatedSelect[T]":
+        return ManagedPaginatedSelect(self, manager)
+
+
+class ManagedPaginatedSelect(ManagedWidget[PaginatedSelect[T]], Generic[T]):
+    def get_cursor(self) -> Optional[str]:
+        """Get a cursor of the current page (None for the first one)."""
+        return self.widget.get_cursor(self.manager)
+
+    def reset(self) -> None:
+        """Go back to the first page."""
+        return self.widget.reset(self.manager)
+
+
 class StatefulSelect(Select[T], ABC, Generic[T]):
     def __init__(
             self,